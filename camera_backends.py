@@ -6,21 +6,232 @@ Supports multiple camera systems with graceful degradation:
 3. Demo mode (no camera - UI testing only)
 """
 
+import io
 import os
+import glob
+import math
 import time
+import queue
+import shutil
 import logging
+import threading
+import subprocess
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from pathlib import Path
 
+from h264_buffer import AnnexBFramer
+
 logger = logging.getLogger(__name__)
 
+# Cached result of the one-time ffmpeg encoder probe (None = not probed yet)
+_h264_encoder = None
+
+# RAM-backed tmpfs used to stage recordings while capturing; SD card block
+# erases during a capture stall the writer and show up as dropped frames
+SHM_DIR = Path('/dev/shm')
+
+
+def detect_h264_encoder():
+    """Return the best ffmpeg H.264 encoder available, probing only once.
+
+    Prefers the Pi's V4L2 M2M hardware encoder (h264_v4l2m2m) and falls back
+    to libx264 software encoding.
+
+    Returns:
+        Encoder name, or None if ffmpeg is not installed
+    """
+    global _h264_encoder
+
+    if _h264_encoder is None:
+        if not shutil.which('ffmpeg'):
+            _h264_encoder = ''
+        else:
+            try:
+                result = subprocess.run(
+                    ['ffmpeg', '-hide_banner', '-encoders'],
+                    capture_output=True,
+                    text=True,
+                    timeout=5
+                )
+                _h264_encoder = 'h264_v4l2m2m' if 'h264_v4l2m2m' in result.stdout else 'libx264'
+            except (subprocess.TimeoutExpired, OSError):
+                _h264_encoder = 'libx264'
+
+            logger.info(f"FFmpeg H.264 encoder: {_h264_encoder}")
+
+    return _h264_encoder or None
+
+
+def staging_path(output_path, duration, bitrate):
+    """Pick where to write a recording while it is being captured.
+
+    Returns a path in /dev/shm when it has room for roughly twice the
+    expected file size, otherwise output_path itself (write straight to disk).
+
+    Args:
+        output_path: Final location of the recording
+        duration: Expected capture length in seconds
+        bitrate: Encoder bitrate in bits per second
+    """
+    output_path = Path(output_path)
+    if not SHM_DIR.is_dir():
+        return output_path
+
+    needed = 2 * bitrate * duration / 8
+    try:
+        free = shutil.disk_usage(SHM_DIR).free
+    except OSError:
+        return output_path
+
+    if free < needed:
+        logger.warning(f"/dev/shm too small for {duration}s recording ({free // 2**20}MB free), writing to disk")
+        return output_path
+    return SHM_DIR / output_path.name
+
+
+def finish_staging(staged_path, output_path):
+    """Move a staged recording to its final location; returns the final path.
+
+    The move is one sequential copy after capture has finished, so SD card
+    latency no longer competes with the frame loop. Across filesystems
+    shutil.move copies with os.sendfile on Linux, so the bytes never pass
+    through userspace.
+    """
+    staged_path, output_path = Path(staged_path), Path(output_path)
+    if staged_path != output_path:
+        shutil.move(staged_path, output_path)
+    return str(output_path)
+
+
+class _FfmpegWriter:
+    """Pipe raw frames into an ffmpeg subprocess for H.264 encoding.
+
+    Mirrors the subset of the cv2.VideoWriter interface used by the backends
+    (write/release/isOpened), so the capture loops don't care which is in use.
+    """
+
+    def __init__(self, output_path, width, height, fps, encoder, pix_fmt='bgr24', bitrate='10M'):
+        cmd = self._input_args(width, height, fps, encoder, pix_fmt, bitrate) + [
+            '-f', 'mp4',
+            str(output_path)
+        ]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    @staticmethod
+    def _input_args(width, height, fps, encoder, pix_fmt, bitrate):
+        return [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', pix_fmt,
+            '-s', f'{width}x{height}',
+            '-r', str(fps),
+            '-i', '-',
+            '-c:v', encoder,
+            '-b:v', bitrate,
+            '-pix_fmt', 'yuv420p',  # Browser-compatible output
+        ]
+
+    def isOpened(self):
+        return self.proc.poll() is None
+
+    def write(self, frame):
+        # Hand ffmpeg the array's own buffer - no tobytes() copy per frame
+        self.proc.stdin.write(memoryview(frame).cast('B'))
+
+    def release(self):
+        if not self.proc.stdin.closed:
+            try:
+                self.proc.stdin.close()
+            except BrokenPipeError:
+                # ffmpeg already exited; wait() below still reaps it
+                pass
+        self.proc.wait()
+
+
+class _FfmpegH264Stream(_FfmpegWriter):
+    """Like _FfmpegWriter, but hands the encoded H.264 to a callback frame by
+    frame instead of writing a file (see CameraBackend.record_to_callback).
+
+    One keyframe per second and no B-frames, so clips can start on any
+    second and frames arrive in display order.
+    """
+
+    def __init__(self, callback, width, height, fps, encoder, pix_fmt='bgr24', bitrate='10M'):
+        cmd = self._input_args(width, height, fps, encoder, pix_fmt, bitrate) + [
+            '-g', str(fps),
+            '-bf', '0',
+            '-f', 'h264',
+            '-'
+        ]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.framer = AnnexBFramer(callback, fps)
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader.start()
+
+    def _read_loop(self):
+        while True:
+            chunk = self.proc.stdout.read1(65536)
+            if not chunk:
+                break
+            self.framer.feed(chunk)
+        self.framer.flush()
+
+    def release(self):
+        super().release()
+        self.reader.join()
+
+
+class StreamingOutput(io.BufferedIOBase):
+    """Latest encoded preview frame, shared by every preview viewer.
+
+    A picamera2 FileOutput writes each JPEG here from the encoder thread;
+    viewers block in wait_frame() until a newer frame than the one they
+    last sent has arrived.
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.sequence = 0
+        self.condition = threading.Condition()
+
+    def write(self, buf):
+        with self.condition:
+            self.frame = buf
+            self.sequence += 1
+            self.condition.notify_all()
+        return len(buf)
+
+    def wait_frame(self, last_sequence, timeout=None):
+        """Wait for a frame newer than last_sequence.
+
+        Returns:
+            (frame, sequence), or (None, last_sequence) on timeout
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.sequence != last_sequence, timeout):
+                return None, last_sequence
+            return self.frame, self.sequence
+
 
 class CameraBackend(ABC):
     """Abstract base class for camera backends."""
+
+    # Short identifier for branching on the backend type (get_name() is
+    # for display)
+    kind = None
+
+    # Target H.264 bitrate (bits/s), used to size buffers
+    bitrate = 10_000_000
     
     @abstractmethod
     def setup(self, config):
-        """Configure camera with given settings."""
+        """Configure camera with given settings.
+
+        config['v4l2_buffer_count'] is the capture queue depth for backends
+        that read frames themselves; keeping it at 1 means the frame read
+        is the newest one, not one a few frames behind real time.
+        """
         pass
     
     @abstractmethod
@@ -44,6 +255,16 @@ class CameraBackend(ABC):
         """
         pass
     
+    def record_to_callback(self, callback, max_duration, cancel_event=None):
+        """Stream H.264 to callback(data, timestamp_us, keyframe) instead of a file.
+
+        Each call delivers one Annex-B encoded frame as a buffer (bytes or a
+        memoryview over the encoder's output) that is only valid for the
+        duration of the call - copy it to keep it. Keyframes carry their
+        SPS/PPS. Blocks until max_duration elapses or cancel_event is set.
+        """
+        raise NotImplementedError(f"{self.get_name()} does not support H.264 streaming")
+
     @abstractmethod
     def cleanup(self):
         """Clean up camera resources."""
@@ -54,22 +275,92 @@ class CameraBackend(ABC):
         """Get backend name for logging."""
         pass
 
+    def capture_luma(self, stream="main"):
+        """Context manager yielding a zero-copy (height, width) uint8 view of
+        the next frame's Y plane.
+
+        stream="lores" gives the ISP-downscaled preview-size frame instead,
+        for consumers that don't need full resolution. Only backends with
+        direct access to camera buffers implement this.
+        """
+        raise NotImplementedError(f"{self.get_name()} does not support zero-copy luma capture")
+
 
 class PiCamera2Backend(CameraBackend):
     """High-performance Raspberry Pi camera with global shutter support."""
 
+    kind = 'picamera2'
+
+    # Cores and SCHED_FIFO priority for the camera/encoder threads
+    CAPTURE_CPUS = {2, 3}
+    CAPTURE_PRIORITY = 10
+
+    # Live preview: JPEGs of the lores stream, at most this wide and fast
+    PREVIEW_MAX_WIDTH = 1280
+    PREVIEW_FPS = 30
+
     def __init__(self):
-        from picamera2 import Picamera2
-        from picamera2.encoders import H264Encoder
-        from picamera2.outputs import FfmpegOutput
+        from picamera2 import Picamera2, MappedArray
+        from picamera2.encoders import H264Encoder, JpegEncoder
+        from picamera2.outputs import CircularOutput, FileOutput, Output
         import libcamera
 
         self.Picamera2 = Picamera2
+        self.MappedArray = MappedArray
         self.H264Encoder = H264Encoder
-        self.FfmpegOutput = FfmpegOutput
+        self.JpegEncoder = JpegEncoder
+        self.CircularOutput = CircularOutput
+        self.FileOutput = FileOutput
+        self.Output = Output
         self.libcamera = libcamera
         self.camera = None
         self.config = None
+        self.main_size = None
+        self.preview_size = None
+        # Always-on encoder feeding a rolling pre-roll buffer (see start())
+        self.encoder = None
+        self.circular = None
+        # Preview JPEG encoder, running only while someone is watching
+        self.preview = StreamingOutput()
+        self.preview_encoder = None
+        self._preview_clients = 0
+        self._preview_lock = threading.Lock()
+
+    # (media device, I2C address) that last accepted a crop. Shared by all
+    # instances and persisted, so reconfigures and restarts skip the scan.
+    _cached_media = None
+    MEDIA_CACHE_FILE = Path.home() / '.cache' / 'golf-cam' / 'media_path'
+
+    def _media_candidates(self):
+        """Yield (media_device, camera_addr) pairs to try, last known-good first."""
+        cached = PiCamera2Backend._cached_media
+        if cached is None:
+            try:
+                device, addr = self.MEDIA_CACHE_FILE.read_text().split()
+                cached = (device, addr)
+            except (OSError, ValueError):
+                pass
+
+        if cached:
+            yield cached
+
+        # Only probe media nodes that exist, in numeric order (matches GScrop)
+        devices = sorted(glob.glob('/dev/media[0-9]*'), key=lambda d: int(d[len('/dev/media'):]))
+        for media_dev in devices:
+            for camera_addr in ['11-001a', '10-001a']:  # Try both I2C addresses
+                if (media_dev, camera_addr) != cached:
+                    yield media_dev, camera_addr
+
+    def _remember_media(self, media):
+        """Cache the working media device in memory and on disk."""
+        if PiCamera2Backend._cached_media == media:
+            return
+        PiCamera2Backend._cached_media = media
+        try:
+            self.MEDIA_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            self.MEDIA_CACHE_FILE.write_text(f"{media[0]} {media[1]}\n")
+        except OSError as e:
+            logger.warning(f"Could not persist media device cache: {e}")
 
     def _apply_sensor_crop(self, width, height):
         """Apply sensor-level cropping via media-ctl to unlock high FPS modes.
@@ -84,11 +375,9 @@ class PiCamera2Backend(CameraBackend):
         Returns:
             True if crop applied successfully, False otherwise
         """
-        import subprocess
-
         # Ensure dimensions are even (Pi 5 requirement)
-        width = width + (width % 2)
-        height = height + (height % 2)
+        width = (width + 1) & ~1
+        height = (height + 1) & ~1
 
         # IMX296 sensor recommended recording area (not full 1456x1088)
         # Sony specs: 1440x1088 is recommended recording pixels
@@ -96,34 +385,32 @@ class PiCamera2Backend(CameraBackend):
         SENSOR_WIDTH = 1440
         SENSOR_HEIGHT = 1088
 
-        # Calculate centered crop offset
-        crop_x = (SENSOR_WIDTH - width) // 2
-        crop_y = (SENSOR_HEIGHT - height) // 2
+        # Calculate centered crop offset, rounded down to an even number
+        crop_x = ((SENSOR_WIDTH - width) // 2) & ~1
+        crop_y = ((SENSOR_HEIGHT - height) // 2) & ~1
 
-        # Ensure offsets are even numbers
-        crop_x = crop_x - (crop_x % 2)
-        crop_y = crop_y - (crop_y % 2)
+        crop_fmt = f"[fmt:SBGGR10_1X10/{width}x{height} crop:({crop_x},{crop_y})/{width}x{height}]"
 
-        # Try all media device numbers (0-5) and I2C addresses
-        # Scan order matches GScrop: 0->1->2->3->4->5
-        for media_num in range(6):  # /dev/media0 through /dev/media5
-            for camera_addr in ['11-001a', '10-001a']:  # Try both I2C addresses
-                crop_cmd = f"'imx296 {camera_addr}':0 [fmt:SBGGR10_1X10/{width}x{height} crop:({crop_x},{crop_y})/{width}x{height}]"
+        for media_dev, camera_addr in self._media_candidates():
+            crop_cmd = f"'imx296 {camera_addr}':0 {crop_fmt}"
 
-                try:
-                    result = subprocess.run(
-                        ['media-ctl', '-d', f'/dev/media{media_num}', '--set-v4l2', crop_cmd, '-v'],
-                        capture_output=True,
-                        text=True,
-                        timeout=3
-                    )
-
-                    if result.returncode == 0:
-                        logger.info(f"Sensor crop applied: {width}x{height} centered at ({crop_x},{crop_y}) (media{media_num}, {camera_addr})")
-                        return True
+            try:
+                result = subprocess.run(
+                    ['media-ctl', '-d', media_dev, '--set-v4l2', crop_cmd, '-v'],
+                    capture_output=True,
+                    text=True,
+                    timeout=3
+                )
+            except FileNotFoundError:
+                logger.warning("media-ctl not installed - cannot apply sensor crop")
+                return False
+            except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
+                continue
 
-                except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError):
-                    continue
+            if result.returncode == 0:
+                logger.info(f"Sensor crop applied: {width}x{height} centered at ({crop_x},{crop_y}) ({media_dev}, {camera_addr})")
+                self._remember_media((media_dev, camera_addr))
+                return True
 
         logger.warning(f"Could not apply sensor crop {width}x{height}")
         return False
@@ -132,8 +419,22 @@ class PiCamera2Backend(CameraBackend):
         """Configure Pi camera with optimal settings for high-speed capture."""
         self.config = config
 
+        # Runtime controls and log labels depend only on config, so build them
+        # once here rather than on every start()/record()
+        self._frame_duration_us = int(1_000_000 / config['fps'])
+        self._runtime_controls = {
+            "FrameDurationLimits": (self._frame_duration_us, self._frame_duration_us)
+        }
+        self._shutter_label = None
+        if not config.get('auto_exposure', False):
+            # Re-applied after start so the shutter speed actually takes effect
+            self._runtime_controls["ExposureTime"] = config['shutter_speed']
+            self._runtime_controls["AeEnable"] = False
+            self._shutter_label = f"{config['shutter_speed']}µs (1/{int(1_000_000 / config['shutter_speed'])}s)"
+
         # Close existing camera if reconfiguring
         if self.camera:
+            self._stop_encoder()
             if self.camera.started:
                 self.camera.stop()
             self.camera.close()
@@ -171,21 +472,52 @@ class PiCamera2Backend(CameraBackend):
             controls["AeEnable"] = False
             controls["AwbEnable"] = False
 
+        # Enough buffers to ride out one ~30 Hz consumer interval (preview,
+        # encoder hand-off) at the sensor rate without libcamera stalling.
+        # v4l2_buffer_count doesn't apply here: the encoder sees every frame
+        # as it completes, so queue depth adds no latency to the ring buffer,
+        # and a single buffer would stall the sensor at high frame rates
+        buffer_count = max(15, math.ceil(config['fps'] / 30))
+
+        # The ISP scales the preview down in hardware, so nothing in Python
+        # ever touches full-resolution frames to show the live view
+        preview_width = min(self.PREVIEW_MAX_WIDTH, config['width'])
+        preview_height = (config['height'] * preview_width // config['width']) & ~1
+
         video_config = self.camera.create_video_configuration(
             main={
                 "size": (config['width'], config['height']),
+                # Semi-planar layout the H.264 encoder ingests directly
+                "format": "NV12"
+            },
+            lores={
+                "size": (preview_width, preview_height),
                 "format": "YUV420"
             },
             controls=controls,
-            buffer_count=15
+            buffer_count=buffer_count,
+            queue=True,
+            display=None,
+            encode="main"
         )
 
-        # For high FPS with sensor crop, disable raw stream which doesn't match crop size
-        # PiCamera2 auto-creates a raw stream at full sensor size, causing mismatch
-        if config['fps'] > 60 and 'raw' in video_config:
-            logger.info(f"Disabling raw stream for high-FPS mode (sensor cropped to {config['width']}x{config['height']})")
+        # Drop the raw stream nothing consumes. libcamera expects every
+        # request to carry a buffer for every configured stream, so an unused
+        # stream costs a buffer per frame. The auto-created raw stream is also
+        # full sensor size, which mismatches the media-ctl crop at high FPS.
+        if video_config.get('raw') is not None:
+            logger.info(f"Disabling unused raw stream (sensor cropped to {config['width']}x{config['height']})")
             video_config['raw'] = None
 
+        # Align stream sizes/strides to what the ISP produces natively so
+        # frames don't need realigning copies on their way out
+        self.camera.align_configuration(video_config)
+        self.main_size = tuple(video_config['main']['size'])
+        if self.main_size != (config['width'], config['height']):
+            logger.info(f"Main stream aligned to {self.main_size[0]}x{self.main_size[1]}")
+        self.preview_size = tuple(video_config['lores']['size'])
+        logger.info(f"Preview (lores) stream: {self.preview_size[0]}x{self.preview_size[1]}")
+
         self.camera.configure(video_config)
 
         # Query and log actual achieved FPS
@@ -200,40 +532,114 @@ class PiCamera2Backend(CameraBackend):
         except Exception:
             logger.info(f"Camera configured: {config['width']}x{config['height']} @ {config['fps']} FPS (requested)")
     
+    @contextmanager
+    def _realtime_capture_threads(self):
+        """Run the block with the calling thread pinned to the capture cores
+        under SCHED_FIFO, so the threads picamera2 spawns for the camera and
+        encoder inherit both. Cores 0-1 stay free for ffmpeg and Flask.
+        """
+        if not hasattr(os, 'sched_setaffinity') or (os.cpu_count() or 1) <= max(self.CAPTURE_CPUS):
+            yield
+            return
+
+        old_affinity = os.sched_getaffinity(0)
+        old_policy = os.sched_getscheduler(0)
+        old_param = os.sched_getparam(0)
+        try:
+            os.sched_setaffinity(0, self.CAPTURE_CPUS)
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.CAPTURE_PRIORITY))
+            except PermissionError:
+                logger.warning("No permission for SCHED_FIFO capture threads (needs CAP_SYS_NICE or LimitRTPRIO)")
+            yield
+        finally:
+            # Only the spawned capture threads keep the real-time settings
+            os.sched_setscheduler(0, old_policy, old_param)
+            os.sched_setaffinity(0, old_affinity)
+
     def start(self):
-        """Start Pi camera."""
+        """Start Pi camera and the always-on pre-roll encoder."""
         if self.camera and not self.camera.started:
-            self.camera.start()
-
-            # Set frame duration as runtime control AFTER starting
-            # This is more reliable than setting in configuration
-            frame_duration_us = int(1_000_000 / self.config['fps'])
-            controls_to_set = {
-                "FrameDurationLimits": (frame_duration_us, frame_duration_us)
-            }
-
-            # Also re-apply exposure time if in manual mode (not auto-exposure)
-            # This ensures the shutter speed actually takes effect
-            if not self.config.get('auto_exposure', False):
-                controls_to_set["ExposureTime"] = self.config['shutter_speed']
-                controls_to_set["AeEnable"] = False
-
-            self.camera.set_controls(controls_to_set)
-            logger.info(f"Set FrameDurationLimits: {frame_duration_us}us ({self.config['fps']} FPS)")
-            if not self.config.get('auto_exposure', False):
-                logger.info(f"Set ExposureTime: {self.config['shutter_speed']}us")
+            with self._realtime_capture_threads():
+                self._start_capture()
+
+            # Outside the real-time block: preview encoding stays off the
+            # capture cores
+            with self._preview_lock:
+                if self._preview_clients:
+                    self._start_preview_encoder()
 
             time.sleep(0.5)
             logger.info("PiCamera2 started")
-    
+
+    def _start_capture(self):
+        """Start streaming and the pre-roll encoder (see start())."""
+        self.camera.start()
+
+        # Set frame duration as runtime control AFTER starting
+        # This is more reliable than setting in configuration
+        self.camera.set_controls(self._runtime_controls)
+        logger.info(f"Set FrameDurationLimits: {self._frame_duration_us}us ({self.config['fps']} FPS)")
+        if self._shutter_label:
+            logger.info(f"Set ExposureTime: {self._shutter_label}")
+
+        # Keep the encoder running into a rolling buffer so recordings
+        # start instantly and include the moments before the trigger
+        pre_record = self.config.get('pre_record_buffer', 2)
+        buffersize = max(1, int(self.config['fps'] * pre_record))
+        # SPS/PPS repeated on every keyframe, one keyframe per second, so a
+        # clip can start on any second of the stream (record_to_callback)
+        self.encoder = self.H264Encoder(bitrate=self.bitrate, repeat=True, iperiod=self.config['fps'])
+        self.circular = self.CircularOutput(buffersize=buffersize)
+        self.camera.start_encoder(self.encoder, self.circular)
+        logger.info(f"Pre-roll buffer: {pre_record}s ({buffersize} frames)")
+
+    def _stop_encoder(self):
+        """Stop the always-on pre-roll encoder (and preview) if running."""
+        if self.encoder:
+            self.camera.stop_encoder()
+            self.encoder = None
+            self.circular = None
+            self.preview_encoder = None
+
+    def start_preview(self):
+        """Register a preview viewer and return the shared StreamingOutput.
+
+        The first viewer starts picamera2's JPEG encoder on the lores stream;
+        it encodes on its own threads, so every viewer just forwards bytes.
+        Pair each call with stop_preview().
+        """
+        with self._preview_lock:
+            self._preview_clients += 1
+            if self.preview_encoder is None and self.camera and self.camera.started:
+                self._start_preview_encoder()
+        return self.preview
+
+    def stop_preview(self):
+        """Unregister a preview viewer; the last one stops the JPEG encoder."""
+        with self._preview_lock:
+            self._preview_clients -= 1
+            if not self._preview_clients and self.preview_encoder:
+                self.camera.stop_encoder(self.preview_encoder)
+                self.preview_encoder = None
+
+    def _start_preview_encoder(self):
+        # Pi 5 has no hardware JPEG block (MJPEGEncoder is Pi 4 only), so
+        # this is the software encoder, skipping frames down to PREVIEW_FPS
+        encoder = self.JpegEncoder(q=75)
+        encoder.frame_skip_count = max(1, round(self.config['fps'] / self.PREVIEW_FPS))
+        self.camera.start_encoder(encoder, self.FileOutput(self.preview), name="lores")
+        self.preview_encoder = encoder
+
     def stop(self):
         """Stop Pi camera."""
         if self.camera and self.camera.started:
+            self._stop_encoder()
             self.camera.stop()
             logger.info("PiCamera2 stopped")
     
     def record(self, output_path, duration, cancel_event=None):
-        """Record with Pi camera using hardware encoding."""
+        """Flush the pre-roll buffer plus duration seconds of hardware-encoded video."""
         # Convert h264 to mp4 for browser compatibility
         output_str = str(output_path)
         if output_str.endswith('.h264'):
@@ -241,44 +647,97 @@ class PiCamera2Backend(CameraBackend):
 
         # Log actual FPS settings before recording
         target_fps = self.config.get('fps', 120)
-        frame_duration_us = int(1_000_000 / target_fps)
-        logger.info(f"Starting recording at {target_fps} FPS (frame duration: {frame_duration_us}us)")
-        logger.info(f"Resolution: {self.config['width']}x{self.config['height']}, Format: YUV420 (full color)")
-
-        # Re-apply camera controls before recording to ensure they stick
-        # PiCamera2 may reset controls when starting a recording
-        controls_to_set = {
-            "FrameDurationLimits": (frame_duration_us, frame_duration_us)
-        }
-        if not self.config.get('auto_exposure', False):
-            controls_to_set["ExposureTime"] = self.config['shutter_speed']
-            controls_to_set["AeEnable"] = False
-            logger.info(f"Setting recording exposure: {self.config['shutter_speed']}µs (1/{int(1000000/self.config['shutter_speed'])}s)")
-
-        self.camera.set_controls(controls_to_set)
-
-        # Always use FfmpegOutput for MP4 container (browser-compatible)
-        encoder = self.H264Encoder(bitrate=10000000)
-        output = self.FfmpegOutput(output_str)
-        self.camera.start_recording(encoder, output)
-
-        # Sleep with cancel event checking
-        start_time = time.time()
-        while (time.time() - start_time) < duration:
-            if cancel_event and cancel_event.is_set():
-                elapsed = time.time() - start_time
+        logger.info(f"Starting recording at {target_fps} FPS (frame duration: {self._frame_duration_us}us)")
+        logger.info(f"Resolution: {self.config['width']}x{self.config['height']}, Format: NV12 (full color)")
+        if self._shutter_label:
+            logger.info(f"Recording exposure: {self._shutter_label}")
+
+        # Capture (pre-roll included) to tmpfs, move to the SD card afterwards
+        pre_record = self.config.get('pre_record_buffer', 2)
+        staged_str = str(staging_path(output_str, duration + pre_record, self.encoder.bitrate))
+
+        # Mux the H.264 stream into MP4 as it is written (stream copy, no
+        # re-encode, no second pass). Fragmented MP4 stays playable even if
+        # the process is killed mid-recording.
+        muxer = subprocess.Popen(
+            ['ffmpeg', '-y', '-loglevel', 'error',
+             '-f', 'h264', '-framerate', str(target_fps), '-i', '-',
+             '-c', 'copy', '-movflags', '+frag_keyframe+empty_moov',
+             '-f', 'mp4', staged_str],
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        # Controls were applied once in start(); the encoder is already running,
+        # so this just starts draining the rolling buffer into the muxer
+        self.circular.fileoutput = muxer.stdin
+        self.circular.start()
+
+        # Block until the duration elapses or the cancel event fires
+        start_time = time.monotonic()
+        if cancel_event:
+            if cancel_event.wait(timeout=duration):
+                elapsed = time.monotonic() - start_time
                 logger.info(f"Recording cancelled after {elapsed:.1f}s (shot detected)")
-                break
-            time.sleep(0.1)  # Check every 100ms
+        else:
+            time.sleep(duration)
 
-        self.camera.stop_recording()
+        # Stopping closes the muxer's stdin, which finalises the file
+        self.circular.stop()
+        if not muxer.stdin.closed:
+            try:
+                muxer.stdin.close()
+            except BrokenPipeError:
+                # The muxer already exited; its return code says why
+                pass
+        stderr = muxer.stderr.read()
+        if muxer.wait() != 0:
+            # Whatever was written is truncated or empty - don't hand it on
+            Path(staged_str).unlink(missing_ok=True)
+            raise RuntimeError(f"MP4 mux failed: {stderr.decode(errors='replace').strip()}")
 
         logger.info(f"Recorded at {self.config.get('fps', 120)}fps - all frames preserved")
-        return output_str
-    
+        return finish_staging(staged_str, output_str)
+
+    def record_to_callback(self, callback, max_duration, cancel_event=None):
+        """Tap the always-on encoder's output for up to max_duration seconds."""
+        class CallbackOutput(self.Output):
+            def outputframe(self, frame, keyframe=True, timestamp=None, *args, **kwargs):
+                callback(frame, timestamp, keyframe)
+
+        output = CallbackOutput()
+        output.start()
+        self.encoder.output = [self.circular, output]
+        try:
+            if cancel_event:
+                cancel_event.wait(timeout=max_duration)
+            else:
+                time.sleep(max_duration)
+        finally:
+            self.encoder.output = self.circular
+            output.stop()
+
+    @contextmanager
+    def capture_luma(self, stream="main"):
+        """Yield a zero-copy view of the next frame's Y plane.
+
+        The array maps the camera's DMA buffer directly (no make_array copy),
+        so it is only valid inside the with-block - copy it to keep it.
+        """
+        width, height = self.main_size if stream == "main" else self.preview_size
+        request = self.camera.capture_request()
+        try:
+            with self.MappedArray(request, stream) as mapped:
+                # NV12 and YUV420 both map as (height * 3/2, stride) with
+                # luma as the top plane
+                yield mapped.array[:height, :width]
+        finally:
+            request.release()
+
     def cleanup(self):
         """Clean up Pi camera."""
         if self.camera:
+            self._stop_encoder()
             if self.camera.started:
                 self.camera.stop()
             self.camera.close()
@@ -289,6 +748,8 @@ class PiCamera2Backend(CameraBackend):
 
 class OpenCVBackend(CameraBackend):
     """Generic camera support via OpenCV (Mac, USB cameras, etc)."""
+
+    kind = 'opencv'
     
     def __init__(self):
         import cv2
@@ -305,12 +766,20 @@ class OpenCVBackend(CameraBackend):
         self.camera.set(self.cv2.CAP_PROP_FRAME_WIDTH, config['width'])
         self.camera.set(self.cv2.CAP_PROP_FRAME_HEIGHT, config['height'])
         self.camera.set(self.cv2.CAP_PROP_FPS, config['fps'])
+
+        # Keep only the newest frame(s) in the driver queue so a slow encode
+        # drops stale frames instead of accumulating latency
+        if not self.camera.set(self.cv2.CAP_PROP_BUFFERSIZE, config.get('v4l2_buffer_count', 1)):
+            logger.info("Camera driver does not support CAP_PROP_BUFFERSIZE - latency may build up under load")
         
         actual_width = int(self.camera.get(self.cv2.CAP_PROP_FRAME_WIDTH))
         actual_height = int(self.camera.get(self.cv2.CAP_PROP_FRAME_HEIGHT))
         actual_fps = int(self.camera.get(self.cv2.CAP_PROP_FPS))
         
         logger.info(f"OpenCV camera configured: {actual_width}x{actual_height} @ {actual_fps}fps")
+
+        if not detect_h264_encoder():
+            logger.warning("ffmpeg not found - falling back to OpenCV software encoding")
         logger.warning("Note: OpenCV backend has limited control vs Pi camera")
         logger.warning("Global shutter, fast exposure, and manual controls not available")
     
@@ -327,75 +796,189 @@ class OpenCVBackend(CameraBackend):
             self.writer = None
         logger.info("OpenCV camera stopped")
     
-    def record(self, output_path, duration, cancel_event=None):
-        """Record with OpenCV (software encoding)."""
-        # Use H.264 codec for browser compatibility
-        # Try different codec options in order of preference
-        width = int(self.camera.get(self.cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(self.camera.get(self.cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = self.config.get('fps', 30)
-
-        output_str = str(output_path)
-        if output_str.endswith('.h264'):
-            output_str = output_str[:-5] + '.mp4'
-
+    def _open_cv2_writer(self, output_str, width, height, fps):
+        """Open a cv2.VideoWriter (software encoding) when ffmpeg is unavailable."""
         # Try H.264 codecs in order of availability
         codecs = ['avc1', 'H264', 'h264', 'X264', 'mp4v']
-        self.writer = None
 
         for codec in codecs:
             try:
                 fourcc = self.cv2.VideoWriter_fourcc(*codec)
-                self.writer = self.cv2.VideoWriter(
+                writer = self.cv2.VideoWriter(
                     output_str,
                     fourcc,
                     fps,
                     (width, height)
                 )
-                if self.writer.isOpened():
+                if writer.isOpened():
                     logger.info(f"Using codec: {codec}")
-                    break
-                else:
-                    self.writer.release()
-                    self.writer = None
+                    return writer
+                writer.release()
             except:
                 pass
 
-        if not self.writer or not self.writer.isOpened():
-            # Fallback to default
-            fourcc = self.cv2.VideoWriter_fourcc(*'mp4v')
-            self.writer = self.cv2.VideoWriter(
-                output_str,
-                fourcc,
-                fps,
-                (width, height)
-            )
-            logger.warning("Using mp4v codec - may not play in all browsers")
-
-        start_time = time.time()
-        frame_count = 0
-
-        while (time.time() - start_time) < duration:
-            # Check for cancellation
-            if cancel_event and cancel_event.is_set():
-                elapsed = time.time() - start_time
-                logger.info(f"Recording cancelled after {elapsed:.1f}s (shot detected)")
-                break
+        # Fallback to default
+        fourcc = self.cv2.VideoWriter_fourcc(*'mp4v')
+        logger.warning("Using mp4v codec - may not play in all browsers")
+        return self.cv2.VideoWriter(
+            output_str,
+            fourcc,
+            fps,
+            (width, height)
+        )
 
-            ret, frame = self.camera.read()
-            if ret:
-                self.writer.write(frame)
-                frame_count += 1
-            else:
-                logger.warning("Failed to read frame")
-                break
+    def record(self, output_path, duration, cancel_event=None):
+        """Record with OpenCV capture and ffmpeg (hardware when available) encoding."""
+        width = int(self.camera.get(self.cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.camera.get(self.cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = self.config.get('fps', 30)
+
+        output_str = str(output_path)
+        if output_str.endswith('.h264'):
+            output_str = output_str[:-5] + '.mp4'
+
+        staged_str = str(staging_path(output_str, duration, self.bitrate))
+
+        encoder = detect_h264_encoder()
+        if encoder:
+            self.writer = _FfmpegWriter(staged_str, width, height, fps, encoder)
+            logger.info(f"Using ffmpeg encoder: {encoder}")
+        else:
+            self.writer = self._open_cv2_writer(staged_str, width, height, fps)
+
+        try:
+            stats = self._capture_to_writer(duration, cancel_event, fps)
+        except Exception:
+            # Encoder or camera failed: don't leave a truncated file behind
+            self.writer.release()
+            self.writer = None
+            Path(staged_str).unlink(missing_ok=True)
+            raise
 
         self.writer.release()
         self.writer = None
 
-        logger.info(f"Recorded {frame_count} frames in {duration}s at {fps}fps - preserving all frames")
+        if stats['queue_dropped']:
+            logger.warning(f"Encoder fell behind: dropped {stats['queue_dropped']} of {stats['captured']} captured frames")
+        logger.info(f"Recorded {stats['written']} frames in {duration}s at {fps}fps")
 
-        return output_str
+        return finish_staging(staged_str, output_str)
+
+    def record_to_callback(self, callback, max_duration, cancel_event=None):
+        """Encode with ffmpeg and stream the H.264 frames to callback."""
+        encoder = detect_h264_encoder()
+        if not encoder:
+            raise RuntimeError("ffmpeg is required for H.264 streaming")
+
+        width = int(self.camera.get(self.cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.camera.get(self.cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = self.config.get('fps', 30)
+
+        self.writer = _FfmpegH264Stream(callback, width, height, fps, encoder)
+        try:
+            stats = self._capture_to_writer(max_duration, cancel_event, fps)
+        finally:
+            self.writer.release()
+            self.writer = None
+
+        if stats['queue_dropped']:
+            logger.warning(f"Encoder fell behind: dropped {stats['queue_dropped']} of {stats['captured']} captured frames")
+
+    def _capture_to_writer(self, duration, cancel_event, fps):
+        """Feed camera frames into self.writer until duration or cancel.
+
+        Returns:
+            dict of captured/written/queue_dropped frame counts
+        """
+        # Capture and encode overlap on two threads joined by a 2-deep queue.
+        # If the encoder falls behind, the oldest queued frame is dropped so
+        # capture never blocks and latency stays bounded.
+        frames = queue.Queue(maxsize=2)
+        stats = {'captured': 0, 'written': 0, 'queue_dropped': 0}
+        # Set once the encoder thread has exited, normally or not, so capture
+        # stops feeding a writer nobody drains (e.g. ffmpeg died)
+        encoder_done = threading.Event()
+        errors = []
+        start_time = time.monotonic()
+
+        def put_latest(item):
+            # Never blocks: if the queue is full the oldest frame is dropped
+            while True:
+                try:
+                    frames.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        frames.get_nowait()
+                        stats['queue_dropped'] += 1
+                    except queue.Empty:
+                        pass
+
+        def capture_loop():
+            # Per-second drop accounting: frames the sensor produced that we
+            # never read because the (1-deep) driver queue overwrote them
+            window_start = start_time
+            window_frames = 0
+
+            try:
+                while (time.monotonic() - start_time) < duration:
+                    if encoder_done.is_set():
+                        break
+
+                    # Check for cancellation
+                    if cancel_event and cancel_event.is_set():
+                        elapsed = time.monotonic() - start_time
+                        logger.info(f"Recording cancelled after {elapsed:.1f}s (shot detected)")
+                        break
+
+                    ret, frame = self.camera.read()
+                    if not ret:
+                        logger.warning("Failed to read frame")
+                        break
+                    stats['captured'] += 1
+                    window_frames += 1
+
+                    put_latest(frame)
+
+                    now = time.monotonic()
+                    if now - window_start >= 1.0:
+                        dropped = int((now - window_start) * fps) - window_frames
+                        if dropped > 0:
+                            logger.info(f"Dropped {dropped} frames in the last {now - window_start:.1f}s (capture behind sensor)")
+                        window_start = now
+                        window_frames = 0
+            except Exception as e:
+                logger.error(f"Frame capture failed: {e}")
+                errors.append(e)
+            finally:
+                put_latest(None)  # Tell the encoder to finish
+
+        def encode_loop():
+            try:
+                while True:
+                    frame = frames.get()
+                    if frame is None:
+                        break
+                    self.writer.write(frame)
+                    stats['written'] += 1
+            except Exception as e:
+                logger.error(f"Frame encoding failed: {e}")
+                errors.append(e)
+            finally:
+                encoder_done.set()
+
+        capture_thread = threading.Thread(target=capture_loop, daemon=True)
+        encode_thread = threading.Thread(target=encode_loop, daemon=True)
+        encode_thread.start()
+        capture_thread.start()
+        capture_thread.join()
+        encode_thread.join()
+
+        if errors:
+            # Surface the failure to record()/record_to_callback() callers
+            raise errors[0]
+
+        return stats
     
     def cleanup(self):
         """Clean up OpenCV camera."""
@@ -411,6 +994,10 @@ class OpenCVBackend(CameraBackend):
 class DemoBackend(CameraBackend):
     """Demo backend for UI testing without camera hardware."""
 
+    kind = 'demo'
+
+    bitrate = 5_000_000
+
     def __init__(self):
         self.config = None
         self.has_cv2 = False
@@ -449,42 +1036,30 @@ class DemoBackend(CameraBackend):
             height = self.config.get('height', 1088)
             fps = self.config.get('fps', 120)
 
-            # Try to create a video writer
-            fourcc = self.cv2.VideoWriter_fourcc(*'mp4v')
-            writer = self.cv2.VideoWriter(output_str, fourcc, fps, (width, height))
+            # Encode like the real backends do (hardware H.264 on a Pi) so demo
+            # mode stays representative; plain cv2 software encode otherwise
+            staged_str = str(staging_path(output_str, duration, self.bitrate))
+            encoder = detect_h264_encoder()
+            if encoder:
+                writer = _FfmpegWriter(staged_str, width, height, fps, encoder, bitrate='5M')
+            else:
+                fourcc = self.cv2.VideoWriter_fourcc(*'mp4v')
+                writer = self.cv2.VideoWriter(staged_str, fourcc, fps, (width, height))
 
             if writer.isOpened():
-                import numpy as np
-
-                # Generate demo frames with animation
                 num_frames = int(fps * duration)
-                for i in range(num_frames):
-                    # Create a gradient background
-                    frame = np.zeros((height, width, 3), dtype=np.uint8)
-
-                    # Animated moving circle
-                    center_x = int(width * (0.2 + 0.6 * (i / num_frames)))
-                    center_y = height // 2
-                    radius = min(width, height) // 8
-
-                    self.cv2.circle(frame, (center_x, center_y), radius, (0, 255, 0), -1)
-
-                    # Add text overlay
-                    text = f"DEMO MODE - Frame {i+1}/{num_frames}"
-                    font = self.cv2.FONT_HERSHEY_SIMPLEX
-                    text_size = self.cv2.getTextSize(text, font, 1, 2)[0]
-                    text_x = (width - text_size[0]) // 2
-                    text_y = 50
-                    self.cv2.putText(frame, text, (text_x, text_y), font, 1, (255, 255, 255), 2)
-
+                for frame in self._demo_frames(width, height, num_frames):
                     writer.write(frame)
 
                 writer.release()
                 logger.info(f"Created demo video with {num_frames} frames at {fps}fps")
-                return output_str
+                return finish_staging(staged_str, output_str)
 
         # Fallback: create a minimal dummy file
-        time.sleep(duration)
+        if cancel_event:
+            cancel_event.wait(timeout=duration)
+        else:
+            time.sleep(duration)
         with open(output_str, 'wb') as f:
             f.write(b'DEMO VIDEO FILE - Generated in demo mode\n')
             f.write(f'Would have recorded: {self.config["width"]}x{self.config["height"]} @ {self.config["fps"]}fps\n'.encode())
@@ -492,6 +1067,74 @@ class DemoBackend(CameraBackend):
 
         logger.warning("Demo mode: cv2 not available, created placeholder file")
         return output_str
+
+    def record_to_callback(self, callback, max_duration, cancel_event=None):
+        """Stream generated demo frames, paced at the configured FPS."""
+        encoder = detect_h264_encoder()
+        if not (self.has_cv2 and encoder):
+            raise RuntimeError("Demo streaming needs OpenCV and ffmpeg")
+
+        width = self.config.get('width', 1456)
+        height = self.config.get('height', 1088)
+        fps = self.config.get('fps', 120)
+
+        writer = _FfmpegH264Stream(callback, width, height, fps, encoder, bitrate='5M')
+        start_time = time.monotonic()
+        try:
+            for i, frame in enumerate(self._demo_frames(width, height, int(fps * max_duration))):
+                # Don't run ahead of real time, so durations match the real backends
+                delay = start_time + i / fps - time.monotonic()
+                if cancel_event:
+                    if cancel_event.wait(timeout=max(0, delay)):
+                        break
+                elif delay > 0:
+                    time.sleep(delay)
+                writer.write(frame)
+        finally:
+            writer.release()
+
+    def _demo_frames(self, width, height, num_frames):
+        """Yield animated demo frames (the same reused buffer each time)."""
+        import numpy as np
+
+        # One frame buffer is reused and only the regions that change are
+        # redrawn: the background is plain black, the circle is a
+        # pre-rendered sprite, and the frame counter lives in a fixed text band.
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+
+        radius = min(width, height) // 8
+        center_y = height // 2
+        size = 2 * radius + 1
+        sprite = np.zeros((size, size, 3), dtype=np.uint8)
+        self.cv2.circle(sprite, (radius, radius), radius, (0, 255, 0), -1)
+        sprite_mask = sprite.any(axis=2, keepdims=True)
+
+        font = self.cv2.FONT_HERSHEY_SIMPLEX
+        text_y = 50
+        (_, text_h), baseline = self.cv2.getTextSize("DEMO MODE", font, 1, 2)
+        text_band = slice(max(0, text_y - text_h - 2), min(height, text_y + baseline + 2))
+
+        circle_region = None
+        for i in range(num_frames):
+            # Erase last frame's circle and counter
+            if circle_region is not None:
+                frame[circle_region] = 0
+            frame[text_band] = 0
+
+            # Animated moving circle
+            center_x = int(width * (0.2 + 0.6 * (i / num_frames)))
+            x0 = center_x - radius
+            y0 = center_y - radius
+            circle_region = (slice(y0, y0 + size), slice(x0, x0 + size))
+            np.copyto(frame[circle_region], sprite, where=sprite_mask)
+
+            # Add text overlay
+            text = f"DEMO MODE - Frame {i+1}/{num_frames}"
+            text_size = self.cv2.getTextSize(text, font, 1, 2)[0]
+            text_x = (width - text_size[0]) // 2
+            self.cv2.putText(frame, text, (text_x, text_y), font, 1, (255, 255, 255), 2)
+
+            yield frame
     
     def cleanup(self):
         """Simulate cleanup."""
@@ -20,10 +20,22 @@ import sys
 import time
 import subprocess
 import os
+import re
+import shlex
+import tempfile
+import threading
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+# Paths that never trigger a sync: build/VCS/venv dirs, recordings and editor
+# droppings. Compiled once; matching is a single C-level scan per event.
+IGNORE_RE = re.compile(
+    r'(^|/)(venv|__pycache__|\.git|recordings)(/|$)'
+    r'|\.(pyc|swp|swo)$'
+    r'|\.DS_Store$'
+)
+
 
 class CodeSyncHandler(FileSystemEventHandler):
     """Handles file system events and syncs changes to Pi."""
@@ -33,28 +45,46 @@ class CodeSyncHandler(FileSystemEventHandler):
         self.pi_user = pi_user
         self.remote_path = remote_path
         self.local_path = local_path
-        self.last_sync = 0
         self.sync_delay = 1.0  # Wait 1 second to batch changes
-        self.pending_sync = False
+        self.dirty = threading.Event()
+
+        # Multiplex every rsync over one persistent SSH connection instead of
+        # paying a fresh handshake per save
+        self.ssh_cmd = [
+            'ssh',
+            '-o', 'ControlMaster=auto',
+            '-o', 'ControlPath=/tmp/devwatch-%r@%h:%p',
+            '-o', 'ControlPersist=600'
+        ]
+        self.compress_args = self._compress_args()
+
+    @staticmethod
+    def _compress_args():
+        """Pick rsync compression flags (zstd needs rsync >= 3.2.3)."""
+        try:
+            result = subprocess.run(['rsync', '--version'], capture_output=True, text=True)
+            if 'zstd' in result.stdout:
+                return ['-z', '--compress-choice=zstd', '--compress-level=1']
+        except OSError:
+            pass
+        return ['-z']
+
+    def warm_up_ssh(self):
+        """Open the shared SSH master connection in the background."""
+        subprocess.run(self.ssh_cmd + ['-fN', f'{self.pi_user}@{self.pi_host}'])
 
     def should_sync(self, path):
         """Check if file should trigger a sync."""
-        # Ignore patterns
-        ignore_patterns = [
-            'venv/', '__pycache__/', '.pyc', '.git/',
-            '.DS_Store', 'recordings/', '*.swp', '*.swo'
-        ]
-
-        path_str = str(path)
-        for pattern in ignore_patterns:
-            if pattern in path_str:
-                return False
-        return True
+        return not IGNORE_RE.search(str(path))
 
     def sync_to_pi(self):
         """Rsync changes to the Pi."""
         cmd = [
-            'rsync', '-av',
+            'rsync', '-a',
+            '--out-format=%n',  # One line per transferred file
+            *self.compress_args,
+            '--partial', '--inplace',
+            '-e', ' '.join(self.ssh_cmd),
             '--exclude', 'venv',
             '--exclude', '__pycache__',
             '--exclude', '*.pyc',
@@ -66,24 +96,40 @@ class CodeSyncHandler(FileSystemEventHandler):
             f'{self.pi_user}@{self.pi_host}:{self.remote_path}/'
         ]
 
+        prefix = f"[{time.strftime('%H:%M:%S')}]"
         try:
-            print(f"[{time.strftime('%H:%M:%S')}] Syncing changes to Pi...")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            if result.returncode == 0:
-                # Only show files that changed (filter out directory lines)
-                output_lines = [l for l in result.stdout.split('\n') if l and not l.endswith('/')]
-                if output_lines:
-                    print(f"[{time.strftime('%H:%M:%S')}] Synced {len(output_lines)} files")
+            print(f"{prefix} Syncing changes to Pi...")
+            # stderr goes to a temp file, not a second pipe: rsync would block
+            # on a full stderr pipe while we're still reading stdout
+            with tempfile.TemporaryFile(mode='w+') as errors:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors, text=True, bufsize=1)
+
+                # Count files as rsync reports them instead of buffering the
+                # whole listing (directory lines end in '/')
+                with proc.stdout:
+                    synced = sum(1 for line in proc.stdout if line.strip() and not line.rstrip().endswith('/'))
+                returncode = proc.wait()
+                errors.seek(0)
+                stderr = errors.read()
+
+            if returncode == 0:
+                if synced:
+                    print(f"{prefix} Synced {synced} files")
                 else:
-                    print(f"[{time.strftime('%H:%M:%S')}] No changes to sync")
+                    print(f"{prefix} No changes to sync")
             else:
-                print(f"[{time.strftime('%H:%M:%S')}] Sync failed: {result.stderr}")
+                print(f"{prefix} Sync failed: {stderr}")
         except Exception as e:
-            print(f"[{time.strftime('%H:%M:%S')}] Sync error: {e}")
+            print(f"{prefix} Sync error: {e}")
 
-        self.last_sync = time.time()
-        self.pending_sync = False
+    def sync_loop(self):
+        """Worker thread: coalesce bursts of changes into a single rsync."""
+        while True:
+            self.dirty.wait()
+            # Let the burst settle, then sync everything that changed in it
+            time.sleep(self.sync_delay)
+            self.dirty.clear()
+            self.sync_to_pi()
 
     def on_any_event(self, event):
         """Handle any file system event."""
@@ -93,29 +139,30 @@ class CodeSyncHandler(FileSystemEventHandler):
         if not self.should_sync(event.src_path):
             return
 
-        # Mark that we have pending changes
-        self.pending_sync = True
+        # Just flag the change - the sync worker does the (slow) rsync so
+        # the watchdog thread is never blocked on the network
+        self.dirty.set()
 
-        # Debounce: only sync if enough time has passed
-        time_since_sync = time.time() - self.last_sync
-        if time_since_sync >= self.sync_delay:
-            self.sync_to_pi()
+
+def _env_value(raw):
+    """Unquote a .env value shell-style (quotes, escapes, trailing comments)."""
+    try:
+        return ' '.join(shlex.split(raw, comments=True))
+    except ValueError:
+        # Unbalanced quotes - take the value literally
+        return raw.strip()
 
 
 def load_env_config():
     """Load configuration from .env.local if it exists."""
     env_file = Path(__file__).parent / '.env.local'
-    config = {}
+    if not env_file.exists():
+        return {}
 
-    if env_file.exists():
-        with open(env_file) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    config[key.strip()] = value.strip()
-
-    return config
+    lines = (line.strip() for line in env_file.read_text().splitlines())
+    pairs = (line.split('=', 1) for line in lines
+             if line and not line.startswith('#') and '=' in line)
+    return {key.strip(): _env_value(value) for key, value in pairs}
 
 
 def main():
@@ -137,21 +184,19 @@ def main():
 
     # Initial sync
     handler = CodeSyncHandler(pi_host, pi_user, remote_path, local_path)
+    handler.warm_up_ssh()
     handler.sync_to_pi()
 
+    sync_thread = threading.Thread(target=handler.sync_loop, daemon=True)
+    sync_thread.start()
+
     # Start watching
     observer = Observer()
     observer.schedule(handler, str(local_path), recursive=True)
     observer.start()
 
     try:
-        while True:
-            time.sleep(1)
-            # Check if we have pending changes to sync
-            if handler.pending_sync:
-                time_since_sync = time.time() - handler.last_sync
-                if time_since_sync >= handler.sync_delay:
-                    handler.sync_to_pi()
+        observer.join()
     except KeyboardInterrupt:
         print("\n\n👋 Stopping file watcher...")
         observer.stop()
@@ -0,0 +1,48 @@
+"""
+Gunicorn settings for running the web interface in production.
+
+Usage:
+    gunicorn -c gunicorn_conf.py web_interface:app
+
+One worker process, many threads: the camera can only be opened by one
+process, and every long-lived /video_feed stream holds a thread, so the
+thread pool (not the process count) is what keeps status polls and
+settings requests responsive while previews are open.
+
+Environment:
+    GOLF_CAM_CONFIG  Configuration file (default config.json)
+    GOLF_CAM_DEMO    Set to 1 for demo mode (no camera)
+
+gevent workers (worker_class = 'gevent') also work: the module-level
+threading locks become cooperative once gevent monkey-patches threading.
+"""
+
+import os
+
+bind = '0.0.0.0:5000'
+workers = 1  # Never more - each worker would try to open the camera
+worker_class = 'gthread'
+threads = 16
+
+# MJPEG streams stay open indefinitely; don't let the arbiter kill the
+# worker for a "hung" request, and keep idle browser connections around
+timeout = 0
+keepalive = 75
+
+
+def post_worker_init(worker):
+    """Open the camera inside the worker process (not the arbiter)."""
+    import web_interface
+
+    web_interface.initialize_camera(
+        os.environ.get('GOLF_CAM_CONFIG', 'config.json'),
+        demo_mode=os.environ.get('GOLF_CAM_DEMO') == '1'
+    )
+
+
+def worker_exit(server, worker):
+    """Release the camera and finish queued uploads on shutdown."""
+    import web_interface
+
+    if web_interface.camera:
+        web_interface.camera.cleanup()
@@ -0,0 +1,228 @@
+"""
+In-memory H.264 ring buffer for launch monitor mode.
+Keeps the last few seconds of the encoder's output so a shot can be saved
+without recording to a temp file and cutting the clip out afterwards.
+"""
+
+import logging
+import threading
+from bisect import bisect_right
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# NAL unit types (H.264 spec table 7-1)
+NAL_SLICE = 1
+NAL_IDR = 5
+NAL_SEI = 6
+NAL_SPS = 7
+NAL_PPS = 8
+NAL_AUD = 9
+
+START_CODE = b'\x00\x00\x00\x01'
+
+
+class CircularH264Buffer:
+    """Fixed-size ring of Annex-B H.264 frames with a keyframe index.
+
+    Frames are copied into one preallocated bytearray. Offsets are absolute
+    (total bytes ever written), so a position p lives at p % capacity and is
+    still readable while p >= head - capacity.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buf = bytearray(capacity)
+        self.head = 0
+        self.tail = 0  # head % capacity, kept incrementally
+        # Absolute offset and timestamp_us of each keyframe still in the ring,
+        # as parallel deques so timestamps can be bisected directly
+        self.keyframe_offsets = deque()
+        self.keyframe_times = deque()
+        self.last_timestamp = None
+        self.lock = threading.Lock()
+
+    def write(self, data, timestamp, keyframe):
+        """Append one encoded frame (the backend's record_to_callback callback).
+
+        data may be any buffer (bytes, memoryview over an encoder buffer); it
+        is copied exactly once, into the ring, and not referenced afterwards.
+        Keyframes must carry their SPS/PPS so a clip can start at any of them.
+        """
+        view = memoryview(data).cast('B')
+        size = view.nbytes
+        if size > self.capacity:
+            logger.warning(f"Dropping {size} byte frame - larger than ring buffer")
+            return
+
+        # Called for every frame on the encoder thread, so keep it lean: one
+        # slice assignment (a memcpy) in the common no-wrap case and the
+        # keyframe bookkeeping only when the ring has actually wrapped
+        buf = self.buf
+        with self.lock:
+            head = self.head
+            tail = self.tail
+            if keyframe:
+                self.keyframe_offsets.append(head)
+                self.keyframe_times.append(timestamp)
+
+            end = tail + size
+            if end <= self.capacity:
+                buf[tail:end] = view
+            else:
+                first = self.capacity - tail
+                end = size - first
+                buf[tail:] = view[:first]
+                buf[:end] = view[first:]
+            self.tail = end if end < self.capacity else 0
+            self.head = head = head + size
+            self.last_timestamp = timestamp
+
+            # Forget keyframes whose bytes have just been overwritten
+            oldest = head - self.capacity
+            offsets = self.keyframe_offsets
+            while offsets and offsets[0] < oldest:
+                offsets.popleft()
+                self.keyframe_times.popleft()
+
+    def write_tail(self, out, seconds):
+        """Write the last `seconds` of video, starting at a keyframe, to out.
+
+        Starts at the newest keyframe at least `seconds` before the latest
+        frame, or the oldest keyframe held if the buffer is shorter than that.
+
+        Returns:
+            Number of bytes written (0 if no keyframe has been buffered)
+        """
+        with self.lock:
+            if not self.keyframe_offsets:
+                return 0
+
+            # Last keyframe at or before the cutoff (or the oldest one held)
+            cutoff = self.last_timestamp - seconds * 1_000_000
+            index = max(0, bisect_right(self.keyframe_times, cutoff) - 1)
+            start = self.keyframe_offsets[index]
+
+            end = self.head
+            pos = start % self.capacity
+            first = min(end - start, self.capacity - pos)
+            view = memoryview(self.buf)
+            out.write(view[pos:pos + first])
+            if first < end - start:
+                out.write(view[:end - start - first])
+            view.release()
+            return end - start
+
+
+class AnnexBFramer:
+    """Split a raw Annex-B H.264 byte stream into frames (access units).
+
+    Used for streams from an ffmpeg pipe, which arrive in arbitrary chunks.
+    Each frame is passed to callback(data, timestamp_us, keyframe), where
+    data is a memoryview that is only valid during the call. The most recent
+    SPS/PPS are prepended to keyframes that don't carry them, so every
+    keyframe is a valid starting point for a clip.
+    """
+
+    def __init__(self, callback, fps):
+        self.callback = callback
+        self.fps = fps
+        self.pending = bytearray()
+        # pending starts at a start code once one has been seen, and bytes
+        # before `scanned` have already been searched for the next one
+        self.synced = False
+        self.scanned = 0
+        self.frame = bytearray()
+        self.frame_has_slice = False
+        self.frame_has_sps = False
+        self.frame_is_key = False
+        self.frame_count = 0
+        self.sps = None
+        self.pps = None
+
+    def feed(self, data):
+        """Consume a chunk of the stream, emitting every completed frame."""
+        buf = self.pending
+        buf += data
+
+        start = 0
+        if not self.synced:
+            start = buf.find(b'\x00\x00\x01')
+            if start < 0:
+                # Keep two bytes in case a start code straddles the chunks
+                del buf[:-2]
+                return
+            self.synced = True
+
+        # Only the new data needs searching (bytearray.find is a C-level
+        # scan), so a large IDR frame arriving in many small reads isn't
+        # rescanned from its start every time
+        search = max(start + 3, self.scanned)
+        view = memoryview(buf)
+        while True:
+            nxt = buf.find(b'\x00\x00\x01', search)
+            if nxt < 0:
+                break
+            self._nal(view, start + 3, nxt)
+            start = nxt
+            search = nxt + 3
+        view.release()
+        del buf[:start]
+        self.scanned = max(3, len(buf) - 2)
+
+    def flush(self):
+        """Emit whatever is left once the stream has ended."""
+        buf = self.pending
+        if buf.startswith(b'\x00\x00\x01'):
+            with memoryview(buf) as view:
+                self._nal(view, 3, len(buf))
+        buf.clear()
+        self.synced = False
+        self.scanned = 0
+        self._emit()
+
+    def _nal(self, view, start, end):
+        # A NAL never ends in a zero byte, so trailing zeros are the next
+        # 4-byte start code's leading zero
+        while end > start and view[end - 1] == 0:
+            end -= 1
+        if end == start:
+            return
+        nal = view[start:end]
+
+        nal_type = nal[0] & 0x1f
+        if nal_type in (NAL_SLICE, NAL_IDR):
+            # first_mb_in_slice == 0 (ue(v) '1' bit) marks a new picture
+            if self.frame_has_slice and len(nal) > 1 and nal[1] & 0x80:
+                self._emit()
+            self.frame_has_slice = True
+            self.frame_is_key |= nal_type == NAL_IDR
+        elif nal_type in (NAL_SEI, NAL_SPS, NAL_PPS, NAL_AUD) or 14 <= nal_type <= 18:
+            # Non-VCL units come before the slices of the picture they belong to
+            if self.frame_has_slice:
+                self._emit()
+            if nal_type == NAL_SPS:
+                self.sps = bytes(nal)
+                self.frame_has_sps = True
+            elif nal_type == NAL_PPS:
+                self.pps = bytes(nal)
+
+        self.frame += START_CODE
+        self.frame += nal
+
+    def _emit(self):
+        if not self.frame_has_slice:
+            return
+
+        if self.frame_is_key and not self.frame_has_sps and self.sps and self.pps:
+            self.frame[0:0] = START_CODE + self.sps + START_CODE + self.pps
+
+        timestamp = self.frame_count * 1_000_000 // self.fps
+        with memoryview(self.frame) as data:
+            self.callback(data, timestamp, self.frame_is_key)
+
+        self.frame_count += 1
+        self.frame.clear()
+        self.frame_has_slice = False
+        self.frame_has_sps = False
+        self.frame_is_key = False
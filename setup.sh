@@ -39,6 +39,21 @@ chmod +x swing_camera.py
 chmod +x web_interface.py
 chmod +x button_trigger.py
 
+echo ""
+echo "Step 7: Reserving CPU cores 2-3 for camera capture..."
+CMDLINE=/boot/firmware/cmdline.txt
+[ -f "$CMDLINE" ] || CMDLINE=/boot/cmdline.txt
+if [ -f "$CMDLINE" ]; then
+    if grep -q "isolcpus=" "$CMDLINE"; then
+        echo "isolcpus already set in $CMDLINE"
+    else
+        sudo sed -i '1 s/$/ isolcpus=2,3/' "$CMDLINE"
+        echo "Added isolcpus=2,3 to $CMDLINE (takes effect after reboot)"
+    fi
+else
+    echo "No cmdline.txt found, skipping"
+fi
+
 echo ""
 echo "==================================="
 echo "Setup Complete! ✓"
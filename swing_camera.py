@@ -4,17 +4,26 @@ High-performance golf swing capture system for Raspberry Pi 5 with global shutte
 Optimized for capturing fast motion with minimal artifacts.
 """
 
+import io
 import os
 import time
 import json
-import pickle
+import queue
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from threading import Thread, Event
+from threading import Thread, Event, Lock, Condition
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from camera_backends import create_camera_backend
+from h264_buffer import CircularH264Buffer
 
 
 class LMState(Enum):
@@ -29,6 +38,78 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Recording file types listed by the UI (metadata sidecars are .json)
+_VIDEO_EXTS = ('.h264', '.mp4')
+
+# Rebuild the recordings listing on a thread pool above this many videos
+RECORDING_SCAN_BATCH = 32
+
+# Resumable upload chunk size for Google Drive (must be a multiple of 256KB)
+GDRIVE_CHUNK_SIZE = 8 * 1024 * 1024
+
+# OAuth token, stored as google-auth's authorized-user JSON (older installs
+# used a pickle, which migrate_gdrive_token() converts on startup)
+GDRIVE_SCOPES = ['https://www.googleapis.com/auth/drive.file']
+GDRIVE_TOKEN_FILE = 'gdrive_token.json'
+_LEGACY_GDRIVE_TOKEN_FILE = 'gdrive_token.pickle'
+
+
+def migrate_gdrive_token():
+    """One-time conversion of a pickled Drive token to GDRIVE_TOKEN_FILE."""
+    if not os.path.exists(_LEGACY_GDRIVE_TOKEN_FILE) or os.path.exists(GDRIVE_TOKEN_FILE):
+        return
+    import pickle
+
+    try:
+        with open(_LEGACY_GDRIVE_TOKEN_FILE, 'rb') as token:
+            creds = pickle.load(token)
+        with open(GDRIVE_TOKEN_FILE, 'w') as token:
+            token.write(creds.to_json())
+        os.remove(_LEGACY_GDRIVE_TOKEN_FILE)
+        logger.info(f"Migrated Google Drive token to {GDRIVE_TOKEN_FILE}")
+    except Exception as e:
+        logger.error(f"Could not migrate {_LEGACY_GDRIVE_TOKEN_FILE}: {e}")
+
+
+def _read_json(path):
+    """Load a JSON file (orjson when installed, stdlib json otherwise)."""
+    if orjson:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _dump_json(data, pretty=False):
+    """Serialize data to compact (or indented) JSON bytes, orjson when installed."""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def _write_json(path, data, pretty=False):
+    """Atomically write data as JSON (orjson when installed).
+
+    Written to a temp file in the same directory, fsynced, then renamed over
+    path, so a power cut leaves either the old or the new file - never a
+    truncated one.
+    """
+    payload = _dump_json(data, pretty)
+
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
 
 class SwingCamera:
     """High-performance golf swing camera with multi-backend support."""
@@ -38,16 +119,47 @@ class SwingCamera:
         self.config = self._load_config(config_path)
         self.backend = create_camera_backend(force_demo=demo_mode)
         self.recording = False
-        self.recording_event = Event()
         self.output_dir = Path(self.config['output_dir'])
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # Launch monitor state
         self.lm_state = LMState.IDLE
         self.lm_recording_thread = None
-        self.lm_temp_file = None
+        self.lm_buffer = None
         self.lm_recording_start_time = None
+        # (state, start time, monotonic time of the transition) published
+        # as one tuple by _set_lm_state, so get_lm_status can read a
+        # consistent set without any lock
+        self._lm_snapshot = (LMState.IDLE, None, time.monotonic())
+        # Guards lm_state transitions; notified when the LM recording thread
+        # finishes. lm_cancel_event is what the backend blocks on.
+        self._lm_cv = Condition()
         self.lm_cancel_event = Event()
+        # Queues of status-change events (see add_lm_listener)
+        self._lm_listeners = set()
+        self._lm_listeners_lock = Lock()
+
+        # Google Drive client, cached across uploads/deletes
+        self._gdrive_service = None
+        self._gdrive_creds = None
+        self._gdrive_token_mtime = None
+        self._gdrive_lock = Lock()
+        migrate_gdrive_token()
+
+        # Metadata writes and uploads run in order on one long-lived worker
+        # thread; sidecars not yet written are served from _pending_metadata
+        self._pending_metadata = {}
+        self._pending_lock = Lock()
+        self._upload_queue = queue.Queue(maxsize=16)
+        self._upload_thread = Thread(target=self._upload_loop, daemon=True)
+        self._upload_thread.start()
+
+        # get_recordings() cache: (output directory mtime, listing). Each
+        # invalidation bumps the generation, so a scan that raced with one
+        # doesn't store its stale result.
+        self._rec_cache = (None, [])
+        self._rec_generation = 0
+        self._rec_cache_lock = Lock()
 
         logger.info(f"Using camera backend: {self.backend.get_name()}")
         self._setup_camera()
@@ -63,10 +175,14 @@ class SwingCamera:
             'format': 'h264',
             'shutter_speed': 2000,
             'pre_record_buffer': 2,
+            'v4l2_buffer_count': 1,
             'upload_enabled': False,
             'upload_destination': '',
             'quality': 'high',
-            'lm_max_recording_duration': 60
+            'lm_max_recording_duration': 60,
+            # Indent metadata sidecars for reading by hand (they're only
+            # ever parsed by the app, so compact by default)
+            'debug_pretty_json': False
         }
         
         if os.path.exists(config_path):
@@ -125,7 +241,6 @@ class SwingCamera:
         
         try:
             self.recording = True
-            self.recording_event.clear()
             
             actual_output_path = self.backend.record(output_path, self.config['duration'])
             # Convert to Path if backend returned a string
@@ -133,26 +248,42 @@ class SwingCamera:
                 actual_output_path = Path(actual_output_path)
             
             self.recording = False
-            self.recording_event.set()
             
             logger.info(f"Recording complete: {actual_output_path}")
             
-            metadata = self._save_metadata(actual_output_path, timestamp)
-            
-            if self.config['upload_enabled']:
-                self._upload_file(actual_output_path)
+            self._finalize_recording(actual_output_path, timestamp)
             
             return str(actual_output_path)
             
         except Exception as e:
             logger.error(f"Recording failed: {e}")
             self.recording = False
-            self.recording_event.set()
             return None
     
-    def _save_metadata(self, video_path, timestamp):
-        """Save metadata about the recording."""
-        metadata = {
+    def _finalize_recording(self, video_path, timestamp):
+        """
+        Hand a finished recording to the upload worker.
+        
+        The worker writes the metadata sidecar and then uploads (if enabled),
+        so the caller returns without waiting on the SD card. Until the
+        sidecar lands, get_recordings() serves the metadata from memory.
+        """
+        metadata = self._build_metadata(video_path, timestamp)
+        upload = self.config['upload_enabled']
+        
+        with self._pending_lock:
+            self._pending_metadata[video_path.name] = metadata
+        
+        try:
+            self._upload_queue.put_nowait((video_path, metadata, upload))
+        except queue.Full:
+            # Never lose the metadata - write it here and skip the upload
+            logger.error(f"Upload queue full, not uploading {video_path}")
+            self._save_metadata(video_path, metadata)
+    
+    def _build_metadata(self, video_path, timestamp):
+        """Metadata about the recording (written as the .json sidecar)."""
+        return {
             'timestamp': timestamp,
             'filename': os.path.basename(video_path),
             'resolution': f"{self.config['width']}x{self.config['height']}",
@@ -161,21 +292,42 @@ class SwingCamera:
             'shutter_speed': self.config['shutter_speed'],
             'file_size': os.path.getsize(video_path)
         }
-        
+    
+    def _save_metadata(self, video_path, metadata):
+        """Write the metadata sidecar for a recording."""
         metadata_path = video_path.with_suffix('.json')
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        return metadata
+        try:
+            _write_json(metadata_path, metadata, self.config['debug_pretty_json'])
+        finally:
+            with self._pending_lock:
+                self._pending_metadata.pop(video_path.name, None)
+            self._invalidate_recordings()
     
-    def _upload_file(self, file_path):
-        """Upload file to configured destination."""
-        upload_thread = Thread(target=self._upload_worker, args=(file_path,))
-        upload_thread.daemon = True
-        upload_thread.start()
+    def _upload_loop(self):
+        """Persistent worker: finalizes queued recordings in order until None."""
+        while True:
+            task = self._upload_queue.get()
+            if task is None:
+                break
+            
+            video_path, metadata, upload = task
+            if not video_path.exists():
+                # Deleted before we got to it
+                with self._pending_lock:
+                    self._pending_metadata.pop(video_path.name, None)
+                continue
+            
+            try:
+                self._save_metadata(video_path, metadata)
+            except Exception as e:
+                logger.error(f"Failed to save metadata for {video_path}: {e}")
+                continue
+            
+            if upload:
+                self._upload_worker(video_path)
     
     def _upload_worker(self, file_path):
-        """Background worker for uploading files."""
+        """Upload one file (runs on the upload thread)."""
         try:
             destination = self.config['upload_destination']
             logger.info(f"Uploading {file_path} to {destination}")
@@ -190,40 +342,82 @@ class SwingCamera:
         except Exception as e:
             logger.error(f"Upload failed: {e}")
     
-    def _upload_to_gdrive(self, file_path, gdrive_path):
-        """Upload file to Google Drive."""
-        from google.oauth2.credentials import Credentials
+    def _get_gdrive_service(self, interactive=False):
+        """Thread-safe wrapper around _load_gdrive_service()."""
+        with self._gdrive_lock:
+            return self._load_gdrive_service(interactive)
+    
+    def _load_gdrive_service(self, interactive=False):
+        """
+        Get the Drive API client, building it only once per token.
+
+        The client (and its discovery document) is cached and reused across
+        uploads and deletes; credentials are refreshed only when expired. A
+        new token written by the web OAuth flow is picked up automatically.
+
+        Args:
+            interactive: Run the local OAuth flow if there is no usable token
+
+        Returns:
+            Drive v3 service, or None if not authenticated
+        """
         from google_auth_oauthlib.flow import InstalledAppFlow
         from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
         from googleapiclient.discovery import build
-        from googleapiclient.http import MediaFileUpload
-        import pickle
         
-        SCOPES = ['https://www.googleapis.com/auth/drive.file']
+        token_file = GDRIVE_TOKEN_FILE
         
-        creds = None
-        token_file = 'gdrive_token.pickle'
+        try:
+            token_mtime = os.stat(token_file).st_mtime_ns
+        except FileNotFoundError:
+            token_mtime = None
         
-        if os.path.exists(token_file):
-            with open(token_file, 'rb') as token:
-                creds = pickle.load(token)
+        if token_mtime != self._gdrive_token_mtime:
+            # Token changed (or appeared) on disk - drop the cached client
+            self._gdrive_service = None
+            self._gdrive_creds = None
+            if token_mtime is not None:
+                self._gdrive_creds = Credentials.from_authorized_user_file(token_file, GDRIVE_SCOPES)
+            self._gdrive_token_mtime = token_mtime
         
+        creds = self._gdrive_creds
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
-            else:
+            elif interactive:
                 if not os.path.exists('gdrive_credentials.json'):
                     logger.error("Google Drive credentials not found. Run setup_gdrive.py first.")
-                    return
+                    return None
                 
                 flow = InstalledAppFlow.from_client_secrets_file(
-                    'gdrive_credentials.json', SCOPES)
+                    'gdrive_credentials.json', GDRIVE_SCOPES)
                 creds = flow.run_local_server(port=0)
+                self._gdrive_service = None
+            else:
+                return None
             
-            with open(token_file, 'wb') as token:
-                pickle.dump(creds, token)
+            with open(token_file, 'w') as token:
+                token.write(creds.to_json())
+            self._gdrive_creds = creds
+            self._gdrive_token_mtime = os.stat(token_file).st_mtime_ns
         
-        service = build('drive', 'v3', credentials=creds)
+        if self._gdrive_service is None:
+            # Use the discovery document bundled with googleapiclient (no
+            # network fetch) and skip its on-disk discovery cache, which
+            # only logs a warning with current oauth2client-free installs
+            self._gdrive_service = build('drive', 'v3', credentials=creds,
+                                         static_discovery=True, cache_discovery=False)
+        
+        return self._gdrive_service
+    
+    def _upload_to_gdrive(self, file_path, gdrive_path):
+        """Upload file to Google Drive."""
+        from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+        
+        service = self._get_gdrive_service(interactive=True)
+        if service is None:
+            return
         
         folder_id = gdrive_path.replace('gdrive://', '')
         
@@ -232,32 +426,39 @@ class SwingCamera:
             'parents': [folder_id] if folder_id else []
         }
         
-        media = MediaFileUpload(str(file_path), resumable=True)
-        file = service.files().create(
+        # Large chunks mean fewer HTTP round trips for big high-FPS videos;
+        # next_chunk() resumes from the last acknowledged chunk on retry
+        media = MediaFileUpload(str(file_path), chunksize=GDRIVE_CHUNK_SIZE, resumable=True)
+        upload_request = service.files().create(
             body=file_metadata,
             media_body=media,
             fields='id,name,webViewLink'
-        ).execute()
+        )
+        file = None
+        while file is None:
+            status, file = upload_request.next_chunk()
+            if status:
+                logger.info(f"Uploading {os.path.basename(file_path)}: {int(status.progress() * 100)}%")
         
         logger.info(f"Upload complete: {file.get('name')} (ID: {file.get('id')})")
         logger.info(f"View at: {file.get('webViewLink')}")
         
         metadata_path = Path(file_path).with_suffix('.json')
         if metadata_path.exists():
-            with open(metadata_path, 'r') as f:
-                metadata = json.load(f)
+            metadata = _read_json(metadata_path)
             
             metadata['gdrive_file_id'] = file.get('id')
             metadata['gdrive_webview_link'] = file.get('webViewLink')
             
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
             metadata_file = {
                 'name': metadata_path.name,
                 'parents': [folder_id] if folder_id else []
             }
-            metadata_media = MediaFileUpload(str(metadata_path), resumable=True)
+            # Upload the updated sidecar straight from memory; it's tiny, so a
+            # single non-resumable request is the fewest round trips
+            payload = _dump_json(metadata, self.config['debug_pretty_json'])
+            metadata_media = MediaIoBaseUpload(io.BytesIO(payload),
+                                               mimetype='application/json', resumable=False)
             metadata_result = service.files().create(
                 body=metadata_file,
                 media_body=metadata_media,
@@ -266,8 +467,11 @@ class SwingCamera:
             
             metadata['gdrive_metadata_file_id'] = metadata_result.get('id')
             
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f, indent=2)
+            # One local write, once both uploads have succeeded
+            _write_json(metadata_path, metadata, self.config['debug_pretty_json'])
+            # The rename bumps the directory mtime, but don't rely on its
+            # granularity (FAT-formatted cards only have 2s resolution)
+            self._invalidate_recordings()
     
     def _upload_via_rsync(self, file_path, destination):
         """Upload file via rsync."""
@@ -287,28 +491,72 @@ class SwingCamera:
         else:
             logger.error(f"Rsync failed: {result.stderr}")
     
+    def _scan_recordings(self):
+        """Yield a DirEntry for every recording video in the output directory.
+        
+        DirEntry names and types come straight from the directory listing, so
+        filtering needs no Path objects or extra stat calls.
+        """
+        with os.scandir(self.output_dir) as it:
+            for entry in it:
+                if entry.name.startswith('swing_') and entry.name.endswith(_VIDEO_EXTS) and entry.is_file():
+                    yield entry
+    
+    def _invalidate_recordings(self):
+        """Force the next get_recordings() to rescan the output directory."""
+        with self._rec_cache_lock:
+            self._rec_generation += 1
+            self._rec_cache = (None, [])
+    
+    def _recording_info(self, entry):
+        """get_recordings() item for one scanned video DirEntry."""
+        # Try the sidecar directly; a missing one is the exception (or
+        # still queued for the upload worker to write)
+        try:
+            metadata = _read_json(os.path.splitext(entry.path)[0] + '.json')
+        except FileNotFoundError:
+            with self._pending_lock:
+                metadata = self._pending_metadata.get(entry.name, {})
+        
+        st = entry.stat()
+        return {
+            'path': entry.path,
+            'name': entry.name,
+            'size': st.st_size,
+            'created': st.st_ctime,
+            'metadata': metadata
+        }
+    
     def get_recordings(self):
-        """Get list of all recordings."""
-        recordings = []
-        for file in sorted(self.output_dir.glob('swing_*.*')):
-            if file.suffix not in ['.h264', '.mp4']:
-                continue
-            
-            metadata_file = file.with_suffix('.json')
-            metadata = {}
-            if metadata_file.exists():
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
-            
-            recordings.append({
-                'path': str(file),
-                'name': file.name,
-                'size': os.path.getsize(file),
-                'created': os.path.getctime(file),
-                'metadata': metadata
-            })
-        
-        return recordings
+        """
+        Get list of all recordings.
+        
+        The listing (including every metadata sidecar) is cached until the
+        output directory's mtime changes or it is explicitly invalidated, so
+        repeated polling doesn't rescan the disk. Safe to call without any
+        camera lock - it only touches the output directory.
+        """
+        dir_mtime = self.output_dir.stat().st_mtime_ns
+        cached_mtime, cached = self._rec_cache
+        if dir_mtime == cached_mtime:
+            return list(cached)
+        
+        generation = self._rec_generation
+        entries = sorted(self._scan_recordings(), key=lambda e: e.name)
+        if len(entries) > RECORDING_SCAN_BATCH:
+            # Sidecar reads are independent small I/Os; overlap them on a
+            # cold rebuild of a large directory
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                recordings = list(executor.map(self._recording_info, entries))
+        else:
+            recordings = [self._recording_info(entry) for entry in entries]
+        
+        with self._rec_cache_lock:
+            # Invalidated mid-scan (e.g. a sidecar rewritten on the same
+            # 2 s FAT mtime tick): the listing may be stale, don't keep it
+            if generation == self._rec_generation:
+                self._rec_cache = (dir_mtime, recordings)
+        return list(recordings)
     
     def delete_recording(self, filename):
         """Delete a recording and its metadata from local storage and Google Drive."""
@@ -320,8 +568,7 @@ class SwingCamera:
         
         metadata = {}
         if metadata_path.exists():
-            with open(metadata_path, 'r') as f:
-                metadata = json.load(f)
+            metadata = _read_json(metadata_path)
         
         gdrive_file_id = metadata.get('gdrive_file_id')
         gdrive_metadata_file_id = metadata.get('gdrive_metadata_file_id')
@@ -347,42 +594,43 @@ class SwingCamera:
         if metadata_path.exists():
             os.remove(metadata_path)
             logger.info(f"Deleted metadata: {metadata_path.name}")
+        
+        self._invalidate_recordings()
     
     def delete_all_recordings(self):
         """Delete all recordings."""
+        names = [entry.name for entry in self._scan_recordings()]
+        
+        # Deletes are dominated by Google Drive round trips, so run them in
+        # parallel rather than one after another
         count = 0
-        for file in list(self.output_dir.glob('swing_*.*')):
-            if file.suffix not in ['.h264', '.mp4', '.json']:
-                continue
-            
-            if file.suffix == '.json':
-                continue
-            
-            try:
-                self.delete_recording(file.name)
-                count += 1
-            except Exception as e:
-                logger.error(f"Failed to delete {file.name}: {e}")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {executor.submit(self.delete_recording, name): name for name in names}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    count += 1
+                except Exception as e:
+                    logger.error(f"Failed to delete {futures[future]}: {e}")
         
+        self._invalidate_recordings()
         return count
     
     def _delete_from_gdrive(self, file_id):
         """Delete a file from Google Drive."""
         try:
-            from google.oauth2.credentials import Credentials
-            from googleapiclient.discovery import build
-            
-            token_file = 'gdrive_token.pickle'
-            
-            if not os.path.exists(token_file):
+            service = self._get_gdrive_service()
+            if service is None:
                 logger.warning("No Google Drive credentials found, skipping Drive deletion")
                 return
             
-            with open(token_file, 'rb') as token:
-                creds = pickle.load(token)
+            # httplib2 connections aren't thread-safe, and deletes run in
+            # parallel: give each request its own authorized connection
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
             
-            service = build('drive', 'v3', credentials=creds)
-            service.files().delete(fileId=file_id).execute()
+            http = AuthorizedHttp(self._gdrive_creds, http=httplib2.Http())
+            service.files().delete(fileId=file_id).execute(http=http)
             
         except Exception as e:
             logger.error(f"Failed to delete from Google Drive: {e}")
@@ -395,38 +643,31 @@ class SwingCamera:
         Returns:
             dict: Status with state and max_duration
         """
-        if self.lm_state != LMState.IDLE:
-            logger.warning(f"Cannot arm: already in state {self.lm_state.value}")
-            return {'status': 'error', 'message': f'Already {self.lm_state.value}'}
-
-        if self.recording:
-            logger.warning("Cannot arm: regular recording in progress")
-            return {'status': 'error', 'message': 'Camera busy with regular recording'}
-
-        # Create temp file for continuous recording
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        if self.config['format'] == 'h264':
-            self.lm_temp_file = self.output_dir / f"temp_lm_{timestamp}.h264"
-        else:
-            self.lm_temp_file = self.output_dir / f"temp_lm_{timestamp}.mp4"
-
-        # Backend will convert h264 to mp4, so update path now
-        # This ensures shot_detected() uses the correct path even if it's called
-        # before the recording thread finishes
-        temp_str = str(self.lm_temp_file)
-        if temp_str.endswith('.h264'):
-            self.lm_temp_file = Path(temp_str[:-5] + '.mp4')
+        with self._lm_cv:
+            if self.lm_state != LMState.IDLE:
+                logger.warning(f"Cannot arm: already in state {self.lm_state.value}")
+                return {'status': 'error', 'message': f'Already {self.lm_state.value}'}
 
-        # Start continuous recording in background thread
-        self.lm_state = LMState.ARMED
-        self.lm_recording_start_time = time.time()
-        self.lm_cancel_event.clear()
+            if self.recording:
+                logger.warning("Cannot arm: regular recording in progress")
+                return {'status': 'error', 'message': 'Camera busy with regular recording'}
+
+            # Hold the clip length plus a second of keyframe slack; x2 headroom
+            # because keyframes and motion push the encoder over its target bitrate
+            clip_seconds = self.config['duration'] + 1
+            capacity = int(clip_seconds * self.backend.bitrate / 8 * 2)
+            self.lm_buffer = CircularH264Buffer(capacity)
+
+            # Start continuous recording in background thread
+            self._set_lm_state(LMState.ARMED, time.monotonic())
+            self.lm_cancel_event.clear()
+            self.recording = True
 
-        self.lm_recording_thread = Thread(target=self._lm_continuous_record)
-        self.lm_recording_thread.daemon = True
-        self.lm_recording_thread.start()
+            self.lm_recording_thread = Thread(target=self._lm_continuous_record)
+            self.lm_recording_thread.daemon = True
+            self.lm_recording_thread.start()
 
-        logger.info(f"Launch monitor armed, recording to {self.lm_temp_file}")
+        logger.info(f"Launch monitor armed, buffering last {self.config['duration']}s ({capacity // 2**20}MB)")
         return {
             'status': 'armed',
             'max_duration': self.config['lm_max_recording_duration']
@@ -434,51 +675,33 @@ class SwingCamera:
 
     def shot_detected(self):
         """
-        Shot detected - stop recording and extract last N seconds.
+        Shot detected - stop recording and save the last N seconds.
 
         Returns:
             dict: Status with filename and path
         """
-        if self.lm_state != LMState.ARMED:
-            logger.warning(f"Cannot detect shot: not armed (state: {self.lm_state.value})")
-            return {'status': 'error', 'message': f'Not armed (state: {self.lm_state.value})'}
-
-        logger.info("Shot detected, stopping recording and extracting clip...")
+        with self._lm_cv:
+            if self.lm_state != LMState.ARMED:
+                logger.warning(f"Cannot detect shot: not armed (state: {self.lm_state.value})")
+                return {'status': 'error', 'message': f'Not armed (state: {self.lm_state.value})'}
 
-        # Signal the recording thread to stop
-        self.lm_state = LMState.PROCESSING
-        self.lm_cancel_event.set()
+            logger.info("Shot detected, stopping recording and saving clip...")
 
-        # Wait for recording to finish
-        if self.lm_recording_thread:
-            self.lm_recording_thread.join(timeout=5)
+            # Signal the recording thread to stop and wait until it has
+            self._set_lm_state(LMState.PROCESSING, self.lm_recording_start_time)
+            self.lm_cancel_event.set()
+            self._lm_cv.wait_for(lambda: not self.recording, timeout=5)
+            buffer = self.lm_buffer
 
         try:
-            # Extract last N seconds from temp file
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"swing_{timestamp}"
+            output_path = self._save_lm_clip(buffer, self.output_dir / f"swing_{timestamp}.mp4")
 
-            # Always use MP4 for browser compatibility
-            # (temp file is already MP4 from camera backend)
-            output_path = self.output_dir / f"{filename}.mp4"
-
-            # Use FFmpeg to extract last N seconds
-            success = self._extract_clip(self.lm_temp_file, output_path, self.config['duration'])
-
-            if success:
-                # Save metadata
-                metadata = self._save_metadata(output_path, timestamp)
-
-                # Upload if enabled
-                if self.config['upload_enabled']:
-                    self._upload_file(output_path)
-
-                logger.info(f"Clip extracted successfully: {output_path}")
+            if output_path:
+                # Metadata write and upload happen on the upload worker
+                self._finalize_recording(output_path, timestamp)
 
-                # Reset state
-                self.lm_state = LMState.IDLE
-                self.lm_temp_file = None
-                self.lm_recording_start_time = None
+                logger.info(f"Clip saved successfully: {output_path}")
 
                 return {
                     'status': 'success',
@@ -486,20 +709,17 @@ class SwingCamera:
                     'path': str(output_path)
                 }
             else:
-                # Reset state even on failure
-                self.lm_state = LMState.IDLE
-                self.lm_temp_file = None
-                self.lm_recording_start_time = None
-
-                return {'status': 'error', 'message': 'Failed to extract clip'}
+                return {'status': 'error', 'message': 'No video buffered'}
 
         except Exception as e:
             logger.error(f"Shot detection failed: {e}")
-            self.lm_state = LMState.IDLE
-            self.lm_temp_file = None
-            self.lm_recording_start_time = None
             return {'status': 'error', 'message': str(e)}
 
+        finally:
+            # Reset state whatever happened
+            with self._lm_cv:
+                self._reset_lm()
+
     def cancel_launch_monitor(self):
         """
         Cancel launch monitor recording without saving.
@@ -507,150 +727,249 @@ class SwingCamera:
         Returns:
             dict: Status message
         """
-        if self.lm_state == LMState.IDLE:
-            return {'status': 'ok', 'message': 'Already idle'}
+        with self._lm_cv:
+            if self.lm_state == LMState.IDLE:
+                return {'status': 'ok', 'message': 'Already idle'}
 
-        logger.info("Cancelling launch monitor recording...")
+            logger.info("Cancelling launch monitor recording...")
 
-        # Signal cancel
-        self.lm_cancel_event.set()
-        self.lm_state = LMState.IDLE
+            # Signal cancel and wait for the recording thread to finish
+            self.lm_cancel_event.set()
+            self._lm_cv.wait_for(lambda: not self.recording, timeout=5)
 
-        # Wait for recording thread to finish
-        if self.lm_recording_thread:
-            self.lm_recording_thread.join(timeout=5)
+            # Reset state (dropping the buffered video)
+            self._reset_lm()
 
-        # Delete temp file
-        if self.lm_temp_file and self.lm_temp_file.exists():
-            try:
-                os.remove(self.lm_temp_file)
-                logger.info(f"Deleted temp file: {self.lm_temp_file}")
-            except Exception as e:
-                logger.error(f"Failed to delete temp file: {e}")
+        return {'status': 'cancelled'}
 
-        # Reset state
-        self.lm_temp_file = None
-        self.lm_recording_start_time = None
+    def _reset_lm(self):
+        """Return the launch monitor to IDLE. Caller holds _lm_cv."""
+        self.lm_buffer = None
+        self._set_lm_state(LMState.IDLE)
+        self._lm_cv.notify_all()
 
-        return {'status': 'cancelled'}
+    def _set_lm_state(self, state, start_time=None):
+        """Transition the launch monitor and notify listeners. Caller holds _lm_cv."""
+        self.lm_state = state
+        self.lm_recording_start_time = start_time
+        self._lm_snapshot = (state, start_time, time.monotonic())
+        self._publish_lm_status()
+
+    def add_lm_listener(self):
+        """
+        Subscribe to launch monitor state changes.
+
+        Returns:
+            queue.Queue that receives a get_lm_status() dict on every state
+            change. Pass it to remove_lm_listener() when done.
+        """
+        listener = queue.Queue(maxsize=8)
+        with self._lm_listeners_lock:
+            self._lm_listeners.add(listener)
+        return listener
+
+    def remove_lm_listener(self, listener):
+        """Unsubscribe a queue returned by add_lm_listener()."""
+        with self._lm_listeners_lock:
+            self._lm_listeners.discard(listener)
+
+    def _publish_lm_status(self):
+        """Push the current status to every listener (never blocks)."""
+        status = self.get_lm_status()
+        with self._lm_listeners_lock:
+            listeners = list(self._lm_listeners)
+        for listener in listeners:
+            try:
+                listener.put_nowait(status)
+            except queue.Full:
+                # A stalled client only misses intermediate states
+                pass
 
     def get_lm_status(self):
         """
         Get current launch monitor status.
 
+        Lock-free: reads the snapshot published by the last transition.
+
         Returns:
-            dict: Current state and timing info
+            dict: Current state and timing info, plus next_poll_ms - how long
+            a polling client can wait before asking again. Short right after
+            a transition (when a follow-up one is likely), longer once the
+            state has settled.
         """
+        state, start_time, changed_at = self._lm_snapshot
         recording_duration = 0
-        if self.lm_recording_start_time:
-            recording_duration = time.time() - self.lm_recording_start_time
+        if start_time is not None:
+            recording_duration = time.monotonic() - start_time
+
+        since_change = time.monotonic() - changed_at
+        if since_change < 2.0:
+            next_poll_ms = 50
+        elif since_change < 10.0:
+            next_poll_ms = 200
+        else:
+            next_poll_ms = 500
 
         return {
-            'state': self.lm_state.value,
+            'state': state.value,
             'recording_duration': round(recording_duration, 2),
-            'max_duration': self.config['lm_max_recording_duration']
+            'max_duration': self.config['lm_max_recording_duration'],
+            'next_poll_ms': next_poll_ms
         }
 
     def _lm_continuous_record(self):
         """Background worker for continuous recording until timeout or cancel."""
-        try:
-            max_duration = self.config['lm_max_recording_duration']
-            logger.info(f"Starting continuous recording (max {max_duration}s)")
-
-            # Start continuous recording using backend
-            # Note: We'll record for max_duration, but can be interrupted
-            self.recording = True
-
-            try:
-                # Record to temp file, passing cancel event for early stopping
-                self.backend.record(self.lm_temp_file, max_duration, self.lm_cancel_event)
-
-                # Check if we were cancelled during recording
-                if self.lm_cancel_event.is_set():
-                    logger.info("Continuous recording cancelled")
-                else:
-                    # Timeout occurred
-                    logger.warning(f"Launch monitor timeout ({max_duration}s) - cancelling")
-                    self.lm_state = LMState.IDLE
-
-                    # Delete temp file on timeout
-                    if self.lm_temp_file and Path(self.lm_temp_file).exists():
-                        os.remove(self.lm_temp_file)
-                        logger.info("Deleted temp file after timeout")
-
-                    self.lm_temp_file = None
-                    self.lm_recording_start_time = None
-
-            finally:
-                self.recording = False
+        max_duration = self.config['lm_max_recording_duration']
+        logger.info(f"Starting continuous recording (max {max_duration}s)")
 
+        try:
+            # Stream encoded frames into the ring buffer; can be interrupted
+            self.backend.record_to_callback(self.lm_buffer.write, max_duration, self.lm_cancel_event)
         except Exception as e:
             logger.error(f"Continuous recording failed: {e}")
-            self.lm_state = LMState.IDLE
+
+        with self._lm_cv:
             self.recording = False
 
-    def _extract_clip(self, input_path, output_path, duration):
+            if self.lm_cancel_event.is_set():
+                logger.info("Continuous recording cancelled")
+            elif self.lm_state == LMState.ARMED:
+                # Timeout (or failure) with nobody waiting on the clip
+                logger.warning(f"Launch monitor timeout ({max_duration}s) - cancelling")
+                self._reset_lm()
+
+            # Wake shot_detected()/cancel_launch_monitor() waiting on us
+            self._lm_cv.notify_all()
+
+    def _save_lm_clip(self, buffer, output_path):
         """
-        Extract last N seconds from video file using FFmpeg.
+        Write the last N seconds of the ring buffer to output_path.
+
+        The buffered H.264 is stream-copied into an MP4 container (no
+        re-encode) so browsers can play it. This runs in-process with PyAV;
+        without PyAV (or if it fails) an ffmpeg subprocess does the same, and
+        failing that the raw .h264 stream is written instead.
 
         Args:
-            input_path: Path to input video file
-            output_path: Path for output video file
-            duration: Number of seconds to extract from end
+            buffer: CircularH264Buffer filled while armed
+            output_path: Path for the .mp4 clip
 
         Returns:
-            bool: True if successful, False otherwise
+            Path of the saved clip, or None if nothing was buffered
         """
-        import subprocess
+        duration = self.config['duration']
 
+        # Each way of saving falls through to the next on failure: the buffer
+        # is dropped once this returns, so a failed mux must not lose the shot
+        written = None
         try:
-            # Use FFmpeg to extract last N seconds with frame-accurate seeking
-            # Re-encode to ensure ALL frames are preserved (critical for high-speed analysis)
-            # -sseof: seek from end of file (negative value)
-            # -c:v libx264: re-encode for frame accuracy (preserves every frame)
-            # -preset ultrafast: fast encoding
-            # -crf 18: high quality (visually lossless)
-            cmd = [
-                'ffmpeg',
-                '-y',  # Overwrite output file
-                '-sseof', f'-{duration}',  # Seek to N seconds before end
-                '-i', str(input_path),
-                '-c:v', 'libx264',  # Re-encode for frame-accurate extraction
-                '-preset', 'ultrafast',  # Fast encoding
-                '-crf', '18',  # High quality (visually lossless)
-                '-vsync', '0',  # Preserve exact frame timing
-                '-c:a', 'copy',  # Copy audio if present
-                str(output_path)
-            ]
-
-            logger.info(f"Extracting last {duration}s from {input_path}")
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode == 0:
-                logger.info(f"Extraction complete: {output_path}")
-
-                # Delete temp file after successful extraction
-                if input_path.exists():
-                    os.remove(input_path)
-                    logger.info(f"Deleted temp file: {input_path}")
-
-                return True
+            import av
+        except ImportError:
+            av = None
+
+        if av is not None:
+            try:
+                written = self._mux_clip_pyav(buffer, output_path, duration)
+            except (av.error.FFmpegError, OSError) as e:
+                # e.g. a tail that doesn't start cleanly at SPS/IDR
+                logger.error(f"PyAV mux failed, trying ffmpeg: {e}")
+                output_path.unlink(missing_ok=True)
+
+        if written is None:
+            try:
+                written = self._mux_clip_ffmpeg(buffer, output_path, duration)
+            except FileNotFoundError:
+                logger.warning("ffmpeg not available - saving raw H.264 clip")
+            except Exception as e:
+                logger.error(f"ffmpeg mux failed, saving raw H.264 clip: {e}")
+                output_path.unlink(missing_ok=True)
+
+        if written is None:
+            output_path = output_path.with_suffix('.h264')
+            with open(output_path, 'wb') as f:
+                written = buffer.write_tail(f, duration)
+
+        if not written:
+            if output_path.exists():
+                os.remove(output_path)
+            return None
+
+        logger.info(f"Saved last {duration}s ({written} bytes) to {output_path}")
+        return output_path
+
+    def _mux_clip_pyav(self, buffer, output_path, duration):
+        """Mux the buffered clip to MP4 in-process; returns bytes of H.264 muxed."""
+        import io
+        from fractions import Fraction
+        import av
+
+        data = io.BytesIO()
+        written = buffer.write_tail(data, duration)
+        if not written:
+            return 0
+        data.seek(0)
+
+        # A raw H.264 stream has no timestamps - number the frames at the
+        # capture rate
+        time_base = Fraction(1, self.config['fps'])
+        with av.open(data, format='h264') as src, \
+                av.open(str(output_path), 'w', format='mp4', options={'movflags': '+faststart'}) as dst:
+            in_stream = src.streams.video[0]
+            if hasattr(dst, 'add_stream_from_template'):
+                out_stream = dst.add_stream_from_template(in_stream)
             else:
-                logger.error(f"FFmpeg failed: {result.stderr}")
-                return False
+                out_stream = dst.add_stream(template=in_stream)
+            out_stream.time_base = time_base
+
+            frame_index = 0
+            for packet in src.demux(in_stream):
+                if not packet.size:
+                    continue  # End-of-stream flush packet
+                packet.pts = packet.dts = frame_index
+                packet.time_base = time_base
+                packet.stream = out_stream
+                dst.mux(packet)
+                frame_index += 1
+
+        return written
+
+    def _mux_clip_ffmpeg(self, buffer, output_path, duration):
+        """Mux the buffered clip to MP4 with an ffmpeg subprocess."""
+        import subprocess
 
-        except subprocess.TimeoutExpired:
-            logger.error("FFmpeg extraction timed out")
-            return False
-        except Exception as e:
-            logger.error(f"Extraction failed: {e}")
-            return False
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'h264', '-framerate', str(self.config['fps']),
+            '-i', '-',
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            str(output_path)
+        ]
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        broken_pipe = False
+        try:
+            written = buffer.write_tail(proc.stdin, duration)
+        except BrokenPipeError:
+            # ffmpeg exited early; its stderr below says why
+            broken_pipe = True
+        finally:
+            # Always reap ffmpeg and close both pipes, whatever happened
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            stderr = proc.stderr.read()
+            proc.stderr.close()
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+        if broken_pipe or (written and proc.returncode != 0):
+            raise RuntimeError(f"MP4 mux failed: {stderr.decode(errors='replace').strip()}")
+        return written
 
     def cleanup(self):
         """Cleanup camera backend."""
@@ -662,6 +981,10 @@ class SwingCamera:
             if self.recording:
                 self.stop()
             self.backend.cleanup()
+
+            # Let queued metadata writes and uploads finish, then stop the worker
+            self._upload_queue.put(None)
+            self._upload_thread.join(timeout=30)
         except Exception as e:
             logger.error(f"Cleanup failed: {e}")
 
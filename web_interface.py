@@ -9,22 +9,329 @@ os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
 from flask import Flask, render_template, jsonify, request, send_file, redirect, session, url_for, Response
 from flask.views import MethodView
+from flask.json.provider import DefaultJSONProvider
+import atexit
+import logging
+import queue
 import threading
 import time
 import json
-import pickle
+import mimetypes
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import quote
 import io
 
-from swing_camera import SwingCamera
+from swing_camera import SwingCamera, GDRIVE_SCOPES, GDRIVE_TOKEN_FILE
+from camera_backends import StreamingOutput
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON (jsonify, request.get_json) via orjson's C encoder/decoder."""
+
+    # numpy scalars and arrays (frame statistics, timings) are encoded in C
+    # too, with no float()/tolist() conversion in the views
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        # Types orjson doesn't know natively go through Flask's default hook
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # The base class formats dumps() into a str that Werkzeug encodes
+        # straight back to bytes; hand orjson's bytes over as they are
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.OPTIONS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
+
+
+class RateLimitFilter(logging.Filter):
+    """Drop repeats of the same log message within `interval` seconds.
+
+    Stops a recurring error (a camera stuck failing every frame) or a
+    slider firing settings updates from flooding the log.
+    """
+
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self._last = {}
+
+    def filter(self, record):
+        now = time.monotonic()
+        key = (record.levelno, record.msg)
+        if now - self._last.get(key, -self.interval) < self.interval:
+            return False
+
+        if len(self._last) > 256:
+            # Forget messages that haven't been seen recently
+            self._last = {k: t for k, t in self._last.items() if now - t < self.interval}
+        self._last[key] = now
+        return True
+
+
+class InProcessQueueHandler(QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread.
+
+    The stdlib version formats each record (traceback included) on the
+    calling thread so it can be pickled; this queue never leaves the
+    process, so the record is handed over as it is.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _start_log_listener():
+    """Route root logging through a queue so handler I/O and formatting
+    happen on a background thread instead of request/camera threads."""
+    root = logging.getLogger()
+    if not root.handlers:
+        return None
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [InProcessQueueHandler(log_queue)]
+    listener.start()
+    # Flush whatever is still queued on shutdown
+    atexit.register(listener.stop)
+    return listener
 
 
 app = Flask(__name__)
+app.logger.addFilter(RateLimitFilter())
+log_listener = _start_log_listener()
+# Only behind a front server that honours X-Sendfile (Apache mod_xsendfile,
+# lighttpd); Flask's own server ignores the header
+app.config['USE_X_SENDFILE'] = bool(os.environ.get('X_SENDFILE'))
+# nginx's equivalent: the internal location that maps onto the recordings
+# directory (e.g. /_recordings/), see SETUP.md
+X_ACCEL_PREFIX = os.environ.get('X_ACCEL_REDIRECT')
+if orjson:
+    app.json = OrjsonProvider(app)
+if Compress:
+    # gzip text/JSON responses; the MJPEG stream and video downloads are
+    # left alone (not in the compressed mimetypes)
+    Compress(app)
 app.secret_key = os.urandom(24)
 camera = None
-camera_lock = threading.Lock()
+
+
+class RWLock:
+    """Readers-writer lock: any number of readers, or one writer.
+
+    `with lock:`, acquire() and release() take it exclusively, exactly like
+    a threading.Lock; read_lock() is for views that only read camera state,
+    so status polls run concurrently instead of queueing behind each other.
+    A waiting writer blocks new readers, so steady polling can't starve it.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire(self, timeout=-1):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                acquired = self._cond.wait_for(lambda: not self._writer and not self._readers,
+                                               None if timeout < 0 else timeout)
+                if acquired:
+                    self._writer = True
+                return acquired
+            finally:
+                self._writers_waiting -= 1
+                # Readers held back for us can go if we gave up
+                self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    @contextmanager
+    def read_lock(self):
+        with self._cond:
+            self._cond.wait_for(lambda: not self._writer and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+
+camera_lock = RWLock()
+# Serializes OpenCV preview reads only; camera_lock is for reconfiguration
+# and recording, so status polls never queue behind a frame read
+frame_lock = threading.Lock()
 config_path = 'config.json'
 
+# Parsed JSON files (config, presets) keyed by path: (st_mtime_ns, data)
+_json_cache = {}
+# os.path.exists results for the Drive auth files: path -> (expires, exists)
+_exists_cache = {}
+EXISTS_TTL = 5.0
+
+
+def _load_json_cached(path):
+    """Parse a JSON file, reusing the previous parse until its mtime changes.
+
+    The returned object is shared - copy it before modifying.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _json_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, 'rb') as f:
+        data = app.json.loads(f.read())
+    _json_cache[path] = (mtime, data)
+    return data
+
+
+def _conditional_json(payload):
+    """jsonify payload with an ETag, answering a matching If-None-Match with 304.
+
+    For endpoints the UI polls: an unchanged result costs no body at all.
+    no-cache keeps the browser revalidating every poll.
+    """
+    response = jsonify(payload)
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+def _save_config(config):
+    """Write config.json and drop its cached parse."""
+    with open(config_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    _json_cache.pop(config_path, None)
+
+
+def _exists_cached(path):
+    """os.path.exists, cached for EXISTS_TTL seconds."""
+    now = time.monotonic()
+    cached = _exists_cache.get(path)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    exists = os.path.exists(path)
+    _exists_cache[path] = (now + EXISTS_TTL, exists)
+    return exists
+
+
+# Background jobs (recordings, delete-all), looked up by id via
+# /api/jobs/<id>. One worker, so jobs run one at a time in the order
+# requested; the last JOB_HISTORY jobs are kept for status lookups. A job
+# returns a dict of result fields, or None if it failed.
+_job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='job')
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+JOB_HISTORY = 32
+
+
+def _submit_job(fn, *args):
+    """Run fn(*args) on the job worker and return the new job's id."""
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _jobs[job_id] = _job_executor.submit(fn, *args)
+        while len(_jobs) > JOB_HISTORY:
+            _jobs.popitem(last=False)
+    return job_id
+
+
+def _jobs_pending():
+    """True if any job is queued or running."""
+    with _jobs_lock:
+        return any(not future.done() for future in _jobs.values())
+
+
+# Responses to mutating POSTs by (method, path, Idempotency-Key), so a
+# double click or a client retry gets the first response instead of running
+# the action again. Entries are Futures: a duplicate that arrives while the
+# first request is still running waits for its result.
+_idempotent = OrderedDict()
+_idempotent_lock = threading.Lock()
+IDEMPOTENCY_HISTORY = 128
+
+
+def idempotent(view):
+    """View decorator honouring the Idempotency-Key request header."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        header = request.headers.get('Idempotency-Key')
+        if not header:
+            return view(*args, **kwargs)
+        # Scoped to the endpoint: the same key sent to another route is a
+        # different request, not a replay
+        key = (request.method, request.path, header)
+
+        with _idempotent_lock:
+            entry = _idempotent.get(key)
+            first = entry is None
+            if first:
+                entry = _idempotent[key] = Future()
+                while len(_idempotent) > IDEMPOTENCY_HISTORY:
+                    _idempotent.popitem(last=False)
+            else:
+                _idempotent.move_to_end(key)
+
+        if not first:
+            status, body, mimetype = entry.result()
+            return app.response_class(body, status=status, mimetype=mimetype)
+
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        except BaseException as e:
+            with _idempotent_lock:
+                _idempotent.pop(key, None)
+            entry.set_exception(e)
+            raise
+
+        if response.status_code >= 500:
+            # Let a retry run the action again
+            with _idempotent_lock:
+                _idempotent.pop(key, None)
+        entry.set_result((response.status_code, response.get_data(), response.mimetype))
+        return response
+
+    return wrapper
+
 
 class IndexView(MethodView):
     """Main page view."""
@@ -35,6 +342,8 @@ class IndexView(MethodView):
 
 class RecordView(MethodView):
     """Handle recording requests."""
+
+    decorators = [idempotent]
     
     def post(self):
         global camera
@@ -44,25 +353,28 @@ class RecordView(MethodView):
             custom_name = data.get('name') if data else None
             
             with camera_lock:
-                if camera.recording:
+                # A job still queued hasn't set camera.recording yet
+                if camera.recording or _jobs_pending():
                     app.logger.warning("Recording already in progress")
                     return jsonify({'status': 'error', 'message': 'Already recording'}), 400
                 
-                def record_async():
+                def record_job():
                     try:
                         output_path = camera.capture_swing(custom_name)
-                        if output_path:
-                            app.logger.info(f"Recording completed: {output_path}")
+                        if not output_path:
+                            return None
+                        app.logger.info(f"Recording completed: {output_path}")
+                        return {'path': output_path}
                     except Exception as e:
                         app.logger.error(f"Recording failed: {e}", exc_info=True)
+                        raise
                 
-                thread = threading.Thread(target=record_async)
-                thread.daemon = True
-                thread.start()
+                job_id = _submit_job(record_job)
                 
                 return jsonify({
                     'status': 'success',
                     'message': 'Recording started',
+                    'job_id': job_id,
                     'duration': camera.config['duration']
                 })
         except Exception as e:
@@ -70,22 +382,70 @@ class RecordView(MethodView):
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+class JobStatusView(MethodView):
+    """Get the state of a background job (see RecordView, DeleteAllRecordingsView)."""
+    
+    def get(self, job_id):
+        with _jobs_lock:
+            future = _jobs.get(job_id)
+        
+        if future is None:
+            return jsonify({'status': 'error', 'message': 'Unknown job'}), 404
+        
+        result = {'status': 'success', 'job_id': job_id}
+        if future.running():
+            result['state'] = 'running'
+        elif not future.done():
+            result['state'] = 'pending'
+        elif future.exception():
+            result.update(state='failed', error=str(future.exception()))
+        elif future.result() is None:
+            # capture_swing() reports failure by returning None
+            result['state'] = 'failed'
+        else:
+            result.update(state='done', **future.result())
+        
+        return jsonify(result)
+
+
 class StatusView(MethodView):
     """Get camera status."""
-    
+
+    # Polled continuously; nothing sends it CORS preflights
+    provide_automatic_options = False
+    # (inputs, body, etag) of the last status served. The status only
+    # changes when a recording starts/stops or the config is edited, so most
+    # polls skip building, serializing and hashing it.
+    _last = (None, b'', None)
+
     def get(self):
         global camera
-        
-        with camera_lock:
-            return jsonify({
-                'recording': camera.recording,
-                'config': {
-                    'fps': camera.config['fps'],
-                    'resolution': f"{camera.config['width']}x{camera.config['height']}",
-                    'duration': camera.config['duration'],
-                    'shutter_speed': camera.config['shutter_speed']
-                }
-            })
+
+        with camera_lock.read_lock():
+            config = camera.config
+            key = (camera.recording, config['fps'], config['width'], config['height'],
+                   config['duration'], config['shutter_speed'])
+
+        last_key, body, etag = StatusView._last
+        if key == last_key:
+            response = app.response_class(body, mimetype='application/json')
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+
+        recording, fps, width, height, duration, shutter_speed = key
+        response = _conditional_json({
+            'recording': recording,
+            'config': {
+                'fps': fps,
+                'resolution': f"{width}x{height}",
+                'duration': duration,
+                'shutter_speed': shutter_speed
+            }
+        })
+        if response.status_code == 200:
+            StatusView._last = (key, response.get_data(), response.get_etag()[0])
+        return response
 
 
 class RecordingsView(MethodView):
@@ -94,9 +454,9 @@ class RecordingsView(MethodView):
     def get(self):
         global camera
         
-        with camera_lock:
-            recordings = camera.get_recordings()
-            return jsonify({'recordings': recordings})
+        # The listing only reads the output directory - no camera_lock, so it
+        # never waits on (or holds up) a reconfigure or recording start
+        return _conditional_json({'recordings': camera.get_recordings()})
 
 
 class DownloadView(MethodView):
@@ -107,10 +467,22 @@ class DownloadView(MethodView):
         
         file_path = camera.output_dir / filename
         
-        if not file_path.exists():
+        if not file_path.is_file():
             return jsonify({'status': 'error', 'message': 'File not found'}), 404
         
-        return send_file(str(file_path), as_attachment=True)
+        if X_ACCEL_PREFIX:
+            # nginx serves the file from its internal location (sendfile,
+            # Range and conditional requests included)
+            response = app.response_class(
+                mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+            response.headers['X-Accel-Redirect'] = f"{X_ACCEL_PREFIX.rstrip('/')}/{quote(filename)}"
+            response.headers.set('Content-Disposition', 'attachment', filename=filename)
+            return response
+
+        # Conditional: honours Range (players can seek without re-downloading)
+        # and If-None-Match/If-Modified-Since. With USE_X_SENDFILE the front
+        # server sends the file itself and no bytes pass through Python.
+        return send_file(file_path.absolute(), as_attachment=True, conditional=True, etag=True)
 
 
 class DeleteRecordingView(MethodView):
@@ -135,14 +507,29 @@ class DeleteRecordingView(MethodView):
 
 
 class DeleteAllRecordingsView(MethodView):
-    """Delete all recordings."""
+    """Delete all recordings.
+
+    Runs as a background job (each delete can include Google Drive round
+    trips): answers 202 with a job_id to poll at /api/jobs/<job_id>.
+    """
     
     def delete(self):
         global camera
         
         try:
-            count = camera.delete_all_recordings()
-            return jsonify({'status': 'success', 'count': count, 'message': f'Deleted {count} recordings'})
+            with camera_lock:
+                # Never delete underneath a recording that is being written
+                if camera.recording or _jobs_pending():
+                    return jsonify({'status': 'error', 'message': 'Busy - try again when the recording has finished'}), 409
+
+                def delete_all_job():
+                    count = camera.delete_all_recordings()
+                    app.logger.info(f"Deleted {count} recordings")
+                    return {'count': count}
+
+                job_id = _submit_job(delete_all_job)
+
+            return jsonify({'status': 'success', 'message': 'Deleting recordings', 'job_id': job_id}), 202
         except Exception as e:
             app.logger.error(f"Failed to delete all recordings: {e}", exc_info=True)
             return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -161,13 +548,12 @@ class ConfigView(MethodView):
     def get(self):
         global config_path
         
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config = _load_json_cached(config_path)
         
-        gdrive_setup = os.path.exists('gdrive_token.pickle')
-        gdrive_credentials = os.path.exists('gdrive_credentials.json')
+        gdrive_setup = _exists_cached(GDRIVE_TOKEN_FILE)
+        gdrive_credentials = _exists_cached('gdrive_credentials.json')
         
-        return jsonify({
+        return _conditional_json({
             'config': config,
             'gdrive_configured': gdrive_setup,
             'gdrive_credentials_present': gdrive_credentials
@@ -183,16 +569,16 @@ class ConfigView(MethodView):
         
         # Load existing config to preserve comments
         existing_config = {}
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                existing_config = json.load(f)
+        try:
+            existing_config = _load_json_cached(config_path)
+        except FileNotFoundError:
+            pass
         
         # Update only the config values, preserve _comments
         if '_comments' in existing_config:
             new_config['_comments'] = existing_config['_comments']
         
-        with open(config_path, 'w') as f:
-            json.dump(new_config, f, indent=2)
+        _save_config(new_config)
         
         app.logger.info(f"Config saved: upload_enabled={new_config.get('upload_enabled')}, upload_destination={new_config.get('upload_destination')}")
 
@@ -208,6 +594,12 @@ class ConfigView(MethodView):
         return jsonify({'status': 'success', 'message': 'Configuration updated'})
 
 
+@lru_cache(maxsize=32)
+def _max_shutter_us(fps):
+    """Longest exposure (µs) that fits one frame at fps, less a 100µs margin."""
+    return int(1_000_000 / fps) - 100
+
+
 class ShutterSpeedView(MethodView):
     """Update shutter speed on-the-fly without restarting camera."""
 
@@ -227,7 +619,7 @@ class ShutterSpeedView(MethodView):
 
         # Calculate maximum shutter speed for current FPS
         fps = camera.config.get('fps', 30)
-        max_shutter = int(1000000 / fps) - 100  # Leave 100µs margin
+        max_shutter = _max_shutter_us(fps)
 
         if shutter_speed > max_shutter:
             return jsonify({
@@ -239,9 +631,7 @@ class ShutterSpeedView(MethodView):
             return jsonify({'status': 'error', 'message': 'Shutter speed must be at least 50µs'}), 400
 
         # Update shutter speed live using PiCamera2 set_controls
-        backend_name = camera.backend.get_name()
-
-        if 'PiCamera2' in backend_name:
+        if camera.backend.kind == 'picamera2':
             try:
                 with camera_lock:
                     # Use PiCamera2's set_controls to update shutter speed on-the-fly
@@ -249,13 +639,14 @@ class ShutterSpeedView(MethodView):
                     # Update config in memory (don't save to file - preview only)
                     camera.config['shutter_speed'] = shutter_speed
 
-                app.logger.info(f"Shutter speed updated live to {shutter_speed}µs (1/{int(1000000/shutter_speed)}s)")
+                fraction = f'1/{1_000_000 // shutter_speed}s'
+                app.logger.info(f"Shutter speed updated live to {shutter_speed}µs ({fraction})")
 
                 return jsonify({
                     'status': 'success',
                     'message': f'Shutter speed updated to {shutter_speed}µs',
                     'shutter_speed': shutter_speed,
-                    'fraction': f'1/{int(1000000/shutter_speed)}s'
+                    'fraction': fraction
                 })
             except Exception as e:
                 app.logger.error(f"Failed to update shutter speed: {e}")
@@ -274,16 +665,15 @@ class PresetView(MethodView):
         """Get available presets."""
         preset_file = 'recording_presets.json'
 
-        if not os.path.exists(preset_file):
+        try:
+            presets_data = _load_json_cached(preset_file)
+        except FileNotFoundError:
             return jsonify({
                 'status': 'error',
                 'message': 'Preset file not found'
             }), 404
 
-        with open(preset_file, 'r') as f:
-            presets_data = json.load(f)
-
-        return jsonify({
+        return _conditional_json({
             'status': 'success',
             'presets': presets_data.get('presets', {}),
             'categories': presets_data.get('categories', {}),
@@ -303,20 +693,19 @@ class PresetView(MethodView):
 
         preset_file = 'recording_presets.json'
 
-        if not os.path.exists(preset_file):
+        try:
+            presets_data = _load_json_cached(preset_file)
+        except FileNotFoundError:
             return jsonify({'status': 'error', 'message': 'Preset file not found'}), 404
 
-        with open(preset_file, 'r') as f:
-            presets_data = json.load(f)
-
         if preset_name not in presets_data.get('presets', {}):
             return jsonify({'status': 'error', 'message': f'Preset "{preset_name}" not found'}), 404
 
         preset = presets_data['presets'][preset_name]
 
         # Load existing config to preserve comments and other settings
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        # (copied - the cached parse is shared)
+        config = dict(_load_json_cached(config_path))
 
         # Apply preset values
         config['width'] = preset['width']
@@ -326,8 +715,7 @@ class PresetView(MethodView):
         config['duration'] = preset['duration']
 
         # Save updated config
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        _save_config(config)
 
         app.logger.info(f"Applied preset '{preset_name}': {preset['width']}x{preset['height']} @ {preset['fps']} FPS")
 
@@ -350,8 +738,8 @@ class GDriveSetupView(MethodView):
     
     def get(self):
         return jsonify({
-            'credentials_present': os.path.exists('gdrive_credentials.json'),
-            'authenticated': os.path.exists('gdrive_token.pickle')
+            'credentials_present': _exists_cached('gdrive_credentials.json'),
+            'authenticated': _exists_cached(GDRIVE_TOKEN_FILE)
         })
     
     def post(self):
@@ -371,6 +759,7 @@ class GDriveSetupView(MethodView):
                 
                 with open('gdrive_credentials.json', 'w') as f:
                     json.dump(content, f, indent=2)
+                _exists_cache.pop('gdrive_credentials.json', None)
                 
                 return jsonify({'status': 'success', 'message': 'Credentials uploaded successfully'})
             except Exception as e:
@@ -393,7 +782,7 @@ class GDriveSetupView(MethodView):
         
         flow = Flow.from_client_secrets_file(
             'gdrive_credentials.json',
-            scopes=['https://www.googleapis.com/auth/drive.file'],
+            scopes=GDRIVE_SCOPES,
             redirect_uri=url_for('gdrive_callback', _external=True)
         )
         
@@ -412,8 +801,6 @@ class GDriveCallbackView(MethodView):
     
     def get(self):
         from google_auth_oauthlib.flow import Flow
-        from googleapiclient.discovery import build
-        import pickle
         
         state = session.get('oauth_state')
         
@@ -422,7 +809,7 @@ class GDriveCallbackView(MethodView):
         
         flow = Flow.from_client_secrets_file(
             'gdrive_credentials.json',
-            scopes=['https://www.googleapis.com/auth/drive.file'],
+            scopes=GDRIVE_SCOPES,
             state=state,
             redirect_uri=url_for('gdrive_callback', _external=True)
         )
@@ -431,11 +818,13 @@ class GDriveCallbackView(MethodView):
         
         credentials = flow.credentials
         
-        with open('gdrive_token.pickle', 'wb') as token:
-            pickle.dump(credentials, token)
+        with open(GDRIVE_TOKEN_FILE, 'w') as token:
+            token.write(credentials.to_json())
+        _exists_cache.pop(GDRIVE_TOKEN_FILE, None)
         
         try:
-            service = build('drive', 'v3', credentials=credentials)
+            # Picks up the token just written and caches the client for uploads
+            service = camera._get_gdrive_service()
             
             results = service.files().list(
                 q="name='Golf Swings' and mimeType='application/vnd.google-apps.folder' and trashed=false",
@@ -487,18 +876,12 @@ class TestUploadView(MethodView):
             return jsonify({'status': 'error', 'message': str(e)}), 400
 
     def _test_gdrive(self, destination):
-        from google.oauth2.credentials import Credentials
-        from googleapiclient.discovery import build
-        import pickle
-
-        if not os.path.exists('gdrive_token.pickle'):
+        # Same cached client the uploads use (rebuilt only when the token
+        # file changes), so a test doesn't pay for a discovery build
+        service = camera._get_gdrive_service()
+        if service is None:
             return {'status': 'error', 'message': 'Not authenticated. Please authenticate first.'}
 
-        with open('gdrive_token.pickle', 'rb') as token:
-            creds = pickle.load(token)
-
-        service = build('drive', 'v3', credentials=creds)
-
         folder_id = destination.replace('gdrive://', '')
 
         try:
@@ -524,6 +907,129 @@ class PreviewView(MethodView):
                              current_gain=camera.config.get('gain', 1.0))
 
 
+class FrameBroker:
+    """Captures and JPEG-encodes preview frames once for every viewer.
+
+    Used for the OpenCV and demo backends (picamera2 encodes its own
+    preview, see PiCamera2Backend.start_preview). The producer thread runs
+    only while at least one viewer is connected.
+    """
+
+    FPS = 30
+
+    def __init__(self):
+        self.output = StreamingOutput()
+        self._clients = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start_preview(self):
+        """Register a viewer and return the shared StreamingOutput."""
+        with self._lock:
+            self._clients += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return self.output
+
+    def stop_preview(self):
+        """Unregister a viewer; the producer exits after the last one."""
+        with self._lock:
+            self._clients -= 1
+
+    def _run(self):
+        import cv2
+
+        # Huffman optimisation costs an extra pass per frame for a few
+        # percent size - not worth it for a LAN preview
+        params = [cv2.IMWRITE_JPEG_QUALITY, 70, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+        try:
+            if camera.backend.kind == 'demo':
+                frames = self._demo_frames(cv2)
+            else:
+                frames = self._camera_frames()
+
+            # Per-frame loop: bind the lookups once
+            imencode = cv2.imencode
+            write = self.output.write
+            lock = self._lock
+            for frame in frames:
+                with lock:
+                    if not self._clients:
+                        self._thread = None
+                        return
+
+                ret, buffer = imencode('.jpg', frame, params)
+                if ret:
+                    write(buffer.tobytes())
+        except Exception as e:
+            app.logger.error(f"Preview producer error: {e}", exc_info=True)
+            with self._lock:
+                self._thread = None
+
+    def _camera_frames(self):
+        """Frames from the OpenCV camera, as fast as it delivers them.
+
+        Each frame is read into the previous one's array (it has been
+        encoded by the time the next read happens).
+        """
+        backend = camera.backend
+        frame = None
+        while True:
+            # A capture released by a concurrent reconfigure just fails the
+            # read, so only the read itself is locked
+            capture = backend.camera
+            if not (capture and capture.isOpened()):
+                time.sleep(0.1)
+                continue
+
+            with frame_lock:
+                ret, image = capture.read(frame)
+            if ret:
+                frame = image
+                yield frame
+
+    def _demo_frames(self, cv2):
+        """Animated demo frames, paced to FPS by deadline."""
+        import numpy as np
+
+        frame_interval = 1.0 / self.FPS
+        next_frame = time.monotonic()
+        frame = None
+        while True:
+            width = camera.config.get('width', 1456)
+            height = camera.config.get('height', 1088)
+
+            # Reuse one frame buffer; reallocate only when the size changes
+            if frame is None or frame.shape[:2] != (height, width):
+                frame = np.zeros((height, width, 3), dtype=np.uint8)
+            else:
+                frame[:] = 0
+
+            # Add moving circle animation
+            t = time.time()
+            center_x = int(width * (0.3 + 0.4 * abs(np.sin(t))))
+            center_y = height // 2
+            cv2.circle(frame, (center_x, center_y), min(width, height) // 10, (0, 255, 0), -1)
+
+            # Add text
+            cv2.putText(frame, 'LIVE PREVIEW - DEMO MODE', (50, 50),
+                      cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+
+            yield frame
+
+            next_frame += frame_interval
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind - don't try to catch up with a burst
+                next_frame = time.monotonic()
+
+
+frame_broker = FrameBroker()
+
+
 class VideoFeedView(MethodView):
     """MJPEG video stream for live preview."""
 
@@ -534,118 +1040,32 @@ class VideoFeedView(MethodView):
     def _generate_frames(self):
         """Generate MJPEG frames from camera."""
         global camera
-        from PIL import Image
-        import io
-
-        try:
-            # Check backend type
-            backend_name = camera.backend.get_name()
 
-            if 'PiCamera2' in backend_name:
-                # PiCamera2 streaming - optimized for high FPS cameras
-                preview_fps = 30  # Limit preview to 30 FPS regardless of camera FPS
-                frame_interval = 1.0 / preview_fps
-                last_frame_time = 0
-
-                while True:
-                    current_time = time.time()
-
-                    # Limit preview FPS to avoid overwhelming the connection
-                    if current_time - last_frame_time < frame_interval:
-                        time.sleep(0.01)
-                        continue
-
-                    try:
-                        # Quick capture without blocking
-                        if camera.backend.camera and camera.backend.camera.started:
-                            # Use PiCamera2's capture_array to get RGB data directly
-                            import numpy as np
-                            frame = camera.backend.camera.capture_array("main")
-
-                            # Frame is in YUV420 format - extract Y plane (grayscale is fine for preview)
-                            height = camera.config['height']
-                            width = camera.config['width']
-                            y_plane = frame[:height, :width]
-
-                            # Convert to PIL Image (grayscale)
-                            img = Image.fromarray(y_plane, mode='L')
-
-                            # Resize if very large to save bandwidth
-                            if width > 1280:
-                                new_width = 1280
-                                new_height = int(height * 1280 / width)
-                                img = img.resize((new_width, new_height), Image.BILINEAR)
-
-                            # Encode to JPEG
-                            buffer = io.BytesIO()
-                            img.save(buffer, format='JPEG', quality=75)
-                            frame_bytes = buffer.getvalue()
-
-                            yield (b'--frame\r\n'
-                                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-
-                            last_frame_time = current_time
-                        else:
-                            time.sleep(0.1)
-
-                    except Exception as e:
-                        app.logger.warning(f"Preview frame error: {e}")
-                        time.sleep(0.1)
-
-            elif 'OpenCV' in backend_name or 'Demo' in backend_name:
-                # OpenCV or Demo mode streaming
-                import cv2
-
-                if 'Demo' in backend_name:
-                    # Generate demo frames
-                    while True:
-                        import numpy as np
-                        width = camera.config.get('width', 1456)
-                        height = camera.config.get('height', 1088)
-
-                        # Create demo frame
-                        frame = np.zeros((height, width, 3), dtype=np.uint8)
-
-                        # Add moving circle animation
-                        t = time.time()
-                        center_x = int(width * (0.3 + 0.4 * abs(np.sin(t))))
-                        center_y = height // 2
-                        cv2.circle(frame, (center_x, center_y), min(width, height) // 10, (0, 255, 0), -1)
-
-                        # Add text
-                        cv2.putText(frame, 'LIVE PREVIEW - DEMO MODE', (50, 50),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-
-                        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-
-                        if ret:
-                            frame_bytes = buffer.tobytes()
-                            yield (b'--frame\r\n'
-                                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-
-                        time.sleep(0.033)  # ~30 fps preview
-
-                else:
-                    # OpenCV camera streaming
-                    while True:
-                        with camera_lock:
-                            if camera.backend.camera and camera.backend.camera.isOpened():
-                                ret, frame = camera.backend.camera.read()
-
-                                if ret:
-                                    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-
-                                    if ret:
-                                        frame_bytes = buffer.tobytes()
-                                        yield (b'--frame\r\n'
-                                               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-                            else:
-                                time.sleep(0.1)
+        # Frames are captured and encoded once for all viewers - by
+        # picamera2's own JPEG encoder, or the FrameBroker thread for the
+        # other backends. Each viewer just forwards the newest one.
+        if camera.backend.kind == 'picamera2':
+            source = camera.backend
+        else:
+            source = frame_broker
 
+        wait_frame = source.start_preview().wait_frame
+        sequence = 0
+        try:
+            while True:
+                frame_bytes, sequence = wait_frame(sequence, timeout=1.0)
+                if frame_bytes is None:
+                    # Camera stopped or reconfiguring
+                    continue
+
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
         except GeneratorExit:
             pass
         except Exception as e:
             app.logger.error(f"Video feed error: {e}", exc_info=True)
+        finally:
+            source.stop_preview()
 
 
 class PreviewSettingsView(MethodView):
@@ -661,9 +1081,9 @@ class PreviewSettingsView(MethodView):
                 return jsonify({'status': 'error', 'message': 'No settings provided'}), 400
 
             with camera_lock:
-                backend_name = camera.backend.get_name()
+                kind = camera.backend.kind
 
-                if 'PiCamera2' in backend_name:
+                if kind == 'picamera2':
                     # Check if resolution change is requested (requires reconfiguration)
                     if 'width' in settings and 'height' in settings:
                         width = int(settings['width'])
@@ -674,7 +1094,7 @@ class PreviewSettingsView(MethodView):
                         camera.config['height'] = height
 
                         # Reconfigure camera
-                        camera.backend.camera.stop()
+                        camera.backend.stop()
                         camera.backend.setup(camera.config)
                         camera.backend.start()
 
@@ -696,7 +1116,7 @@ class PreviewSettingsView(MethodView):
                         camera.backend.camera.set_controls(controls)
                         app.logger.info(f"Updated camera controls: {controls}")
 
-                elif 'OpenCV' in backend_name:
+                elif kind == 'opencv':
                     # OpenCV has limited control, but we can try
                     if 'fps' in settings and camera.backend.camera:
                         import cv2
@@ -717,29 +1137,16 @@ class TestMaxFPSView(MethodView):
         try:
             import time
 
-            # Try to acquire the lock with a longer timeout to allow video stream to stop
-            # Video stream releases lock between frames, so we retry multiple times
-            max_retries = 5
-            retry_delay = 0.3
-            lock_acquired = False
-
-            for attempt in range(max_retries):
-                lock_acquired = camera_lock.acquire(timeout=0.5)
-                if lock_acquired:
-                    break
-                app.logger.info(f"Lock acquisition attempt {attempt + 1}/{max_retries} failed, retrying...")
-                time.sleep(retry_delay)
-
-            if not lock_acquired:
+            # The preview never takes camera_lock, so this only waits out a
+            # reconfiguration or recording start in progress
+            if not camera_lock.acquire(timeout=2.0):
                 return jsonify({
                     'status': 'error',
                     'message': 'Camera is busy. Please try again in a moment.'
                 }), 409  # Conflict status code
 
             try:
-                backend_name = camera.backend.get_name()
-
-                if 'PiCamera2' not in backend_name:
+                if camera.backend.kind != 'picamera2':
                     return jsonify({
                         'status': 'error',
                         'message': 'FPS testing only available with PiCamera2 backend'
@@ -751,61 +1158,72 @@ class TestMaxFPSView(MethodView):
 
                 app.logger.info(f"Starting FPS test: target {target_fps} FPS at {resolution}")
 
-                # Capture frames for 3 seconds - use capture_array for maximum speed
+                # Count frames for 3 seconds - metadata only, for maximum speed
                 test_duration = 3.0
                 frames_captured = 0
-                start_time = time.time()
-                sensor_timestamps = []
-
-                # Capture frames as fast as possible with metadata
+                # Sensor timestamps (ns): only the first 11 (for the 10
+                # intervals reported) plus the latest and a count are needed
+                first_timestamps = []
+                last_timestamp = None
+                timestamp_count = 0
+
+                def on_request(request):
+                    # Runs on picamera2's event thread for every completed
+                    # request, so no frame waits on a capture_request() round
+                    # trip through the request thread; only the metadata is
+                    # read and the buffer is never mapped
+                    nonlocal frames_captured, last_timestamp, timestamp_count
+                    frames_captured += 1
+
+                    # Get sensor timestamp for ground-truth FPS
+                    timestamp = request.get_metadata().get('SensorTimestamp')
+                    if timestamp is not None:
+                        if timestamp_count <= 10:
+                            first_timestamps.append(timestamp)
+                        last_timestamp = timestamp
+                        timestamp_count += 1
+
+                picam2 = camera.backend.camera
+                previous_callback = picam2.post_callback
+                start_time = time.monotonic()
+                picam2.post_callback = on_request
                 try:
-                    while (time.time() - start_time) < test_duration:
-                        # Capture frame and metadata together using request API
-                        request = camera.backend.camera.capture_request()
-                        try:
-                            array = request.make_array("main")
-                            metadata = request.get_metadata()
-
-                            frames_captured += 1
-
-                            # Get sensor timestamp for ground-truth FPS
-                            if 'SensorTimestamp' in metadata:
-                                sensor_timestamps.append(metadata['SensorTimestamp'])
-                        finally:
-                            request.release()
-
-                except Exception as e:
-                    app.logger.warning(f"Frame capture error: {e}")
-                    if frames_captured == 0:
-                        return jsonify({
-                            'status': 'error',
-                            'message': f'FPS test failed: {str(e)}'
-                        }), 500
-
-                actual_duration = time.time() - start_time
+                    time.sleep(test_duration)
+                finally:
+                    picam2.post_callback = previous_callback
+
+                if frames_captured == 0:
+                    return jsonify({
+                        'status': 'error',
+                        'message': 'FPS test failed: no frames received from the camera'
+                    }), 500
+
+                actual_duration = time.monotonic() - start_time
                 capture_fps = frames_captured / actual_duration if frames_captured > 0 else 0
 
                 # Calculate ground-truth FPS from sensor timestamps (most accurate)
-                sensor_intervals = []
+                first_intervals = []
                 sensor_fps = 0
-                if len(sensor_timestamps) > 10:
-                    # Sensor timestamps are in nanoseconds
-                    sensor_intervals = [(sensor_timestamps[i] - sensor_timestamps[i-1]) / 1_000_000
-                                      for i in range(1, min(len(sensor_timestamps), 11))]
-                    avg_sensor_interval = sum(sensor_intervals) / len(sensor_intervals) if sensor_intervals else 0
+                avg_sensor_interval = 0
+                if timestamp_count > 10:
+                    # The intervals telescope, so their mean over the whole
+                    # test is just the span divided by the interval count
+                    span = last_timestamp - first_timestamps[0]
+                    avg_sensor_interval = span / (timestamp_count - 1) / 1_000_000
+                    # Rounded once, for both the log line and the response
+                    first_intervals = [round((b - a) / 1_000_000, 2)
+                                       for a, b in zip(first_timestamps, first_timestamps[1:])]
 
                     # Calculate FPS from average sensor interval
                     if avg_sensor_interval > 0:
                         sensor_fps = 1000.0 / avg_sensor_interval
-                else:
-                    avg_sensor_interval = 0
 
                 # Use sensor FPS as the "actual" FPS (ground truth)
                 actual_fps = sensor_fps if sensor_fps > 0 else capture_fps
 
                 app.logger.info(f"FPS test complete: {actual_fps:.1f} FPS (sensor) / {capture_fps:.1f} FPS (capture)")
                 app.logger.info(f"({frames_captured} frames in {actual_duration:.2f}s)")
-                app.logger.info(f"Sensor intervals (ms): {[f'{x:.2f}' for x in sensor_intervals[:10]]}")
+                app.logger.info(f"Sensor intervals (ms): {first_intervals}")
 
                 return jsonify({
                     'status': 'success',
@@ -818,7 +1236,7 @@ class TestMaxFPSView(MethodView):
                     'resolution': resolution,
                     'diagnostics': {
                         'avg_sensor_interval_ms': round(avg_sensor_interval, 2) if avg_sensor_interval > 0 else None,
-                        'sensor_intervals_ms': [round(x, 2) for x in sensor_intervals[:10]]
+                        'sensor_intervals_ms': first_intervals
                     }
                 })
             finally:
@@ -829,64 +1247,89 @@ class TestMaxFPSView(MethodView):
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-class LMArmView(MethodView):
-    """Arm the launch monitor - start continuous recording."""
-
-    def post(self):
-        global camera
+class LMActionView(MethodView):
+    """Run one launch monitor transition (arm, shot detected, cancel).
 
-        try:
-            with camera_lock:
-                result = camera.arm_launch_monitor()
-                return jsonify(result)
-        except Exception as e:
-            app.logger.error(f"Failed to arm launch monitor: {e}", exc_info=True)
-            return jsonify({'status': 'error', 'message': str(e)}), 500
+    The three POST endpoints differ only in the SwingCamera method they call,
+    so they share this view, bound per route via as_view arguments. The
+    method is passed unbound (SwingCamera.arm_launch_monitor): resolved once
+    at import, yet always applied to the current camera.
+    """
 
+    decorators = [idempotent]
 
-class LMShotDetectedView(MethodView):
-    """Shot detected - stop recording and extract clip."""
+    def __init__(self, action, error_message):
+        self.action = action
+        self.error_message = error_message
 
     def post(self):
         global camera
 
         try:
             with camera_lock:
-                result = camera.shot_detected()
+                result = self.action(camera)
                 return jsonify(result)
         except Exception as e:
-            app.logger.error(f"Shot detection failed: {e}", exc_info=True)
+            app.logger.error(f"{self.error_message}: {e}", exc_info=True)
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-class LMCancelView(MethodView):
-    """Cancel launch monitor recording."""
+class LMStatusView(MethodView):
+    """Get launch monitor status."""
 
-    def post(self):
+    # Serialized status shared by polls within TTL seconds of each other
+    # (several tabs polling at 10-20 Hz each)
+    TTL = 0.05
+    _cache = (0.0, None)
+    _cache_lock = threading.Lock()
+    provide_automatic_options = False
+
+    def get(self):
         global camera
 
         try:
-            with camera_lock:
-                result = camera.cancel_launch_monitor()
-                return jsonify(result)
+            with self._cache_lock:
+                cached_at, payload = LMStatusView._cache
+                now = time.monotonic()
+                if payload is None or now - cached_at >= self.TTL:
+                    # get_lm_status reads an atomically published snapshot,
+                    # so polls never wait behind a recording or settings change
+                    result = camera.get_lm_status()
+                    # Encoded once here rather than on every response
+                    payload = app.json.dumps(result).encode()
+                    LMStatusView._cache = (now, payload)
+            return app.response_class(payload, mimetype='application/json')
         except Exception as e:
-            app.logger.error(f"Failed to cancel launch monitor: {e}", exc_info=True)
+            app.logger.error(f"Failed to get LM status: {e}", exc_info=True)
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-class LMStatusView(MethodView):
-    """Get launch monitor status."""
+class LMEventsView(MethodView):
+    """Launch monitor status as a Server-Sent Events stream.
+
+    Pushes the status on every state change, and once a second in between
+    (keeps the connection alive and recording_duration current), so a UI
+    needs one long-lived request instead of polling /api/lm/status.
+    """
 
     def get(self):
+        return Response(self._generate_events(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache'})
+
+    def _generate_events(self):
         global camera
 
+        listener = camera.add_lm_listener()
         try:
-            with camera_lock:
-                result = camera.get_lm_status()
-                return jsonify(result)
-        except Exception as e:
-            app.logger.error(f"Failed to get LM status: {e}", exc_info=True)
-            return jsonify({'status': 'error', 'message': str(e)}), 500
+            status = camera.get_lm_status()
+            while True:
+                yield f"data: {app.json.dumps(status)}\n\n"
+                try:
+                    status = listener.get(timeout=1.0)
+                except queue.Empty:
+                    status = camera.get_lm_status()
+        finally:
+            camera.remove_lm_listener(listener)
 
 
 app.add_url_rule('/', view_func=IndexView.as_view('index'))
@@ -894,6 +1337,7 @@ app.add_url_rule('/settings', view_func=SettingsView.as_view('settings'))
 app.add_url_rule('/preview', view_func=PreviewView.as_view('preview'))
 app.add_url_rule('/api/record', view_func=RecordView.as_view('record'))
 app.add_url_rule('/api/status', view_func=StatusView.as_view('status'))
+app.add_url_rule('/api/jobs/<job_id>', view_func=JobStatusView.as_view('job_status'))
 app.add_url_rule('/api/recordings', view_func=RecordingsView.as_view('recordings'), methods=['GET'])
 app.add_url_rule('/api/recordings', view_func=DeleteAllRecordingsView.as_view('delete_all_recordings'), methods=['DELETE'])
 app.add_url_rule('/api/recordings/<filename>', view_func=DeleteRecordingView.as_view('delete_recording'), methods=['DELETE'])
@@ -908,10 +1352,18 @@ app.add_url_rule('/video_feed', view_func=VideoFeedView.as_view('video_feed'))
 app.add_url_rule('/api/preview-settings', view_func=PreviewSettingsView.as_view('preview_settings'))
 app.add_url_rule('/api/test-max-fps', view_func=TestMaxFPSView.as_view('test_max_fps'))
 # Launch monitor API endpoints
-app.add_url_rule('/api/lm/arm', view_func=LMArmView.as_view('lm_arm'))
-app.add_url_rule('/api/lm/shot-detected', view_func=LMShotDetectedView.as_view('lm_shot_detected'))
-app.add_url_rule('/api/lm/cancel', view_func=LMCancelView.as_view('lm_cancel'))
+app.add_url_rule('/api/lm/arm', view_func=LMActionView.as_view(
+    'lm_arm', SwingCamera.arm_launch_monitor, "Failed to arm launch monitor"))
+app.add_url_rule('/api/lm/shot-detected', view_func=LMActionView.as_view(
+    'lm_shot_detected', SwingCamera.shot_detected, "Shot detection failed"))
+app.add_url_rule('/api/lm/cancel', view_func=LMActionView.as_view(
+    'lm_cancel', SwingCamera.cancel_launch_monitor, "Failed to cancel launch monitor"))
 app.add_url_rule('/api/lm/status', view_func=LMStatusView.as_view('lm_status'))
+app.add_url_rule('/api/lm/events', view_func=LMEventsView.as_view('lm_events'))
+
+# Sort and compile the rule table now instead of lazily (under Werkzeug's
+# remap lock) on the first request
+app.url_map.update()
 
 
 def initialize_camera(config_path='config.json', demo_mode=False):
@@ -929,6 +1381,8 @@ def initialize_camera(config_path='config.json', demo_mode=False):
 
 if __name__ == '__main__':
     import argparse
+    import importlib.util
+    import sys
     
     parser = argparse.ArgumentParser(description='Golf Swing Camera Web Interface')
     parser.add_argument('--config', default='config.json', help='Configuration file')
@@ -939,6 +1393,22 @@ if __name__ == '__main__':
 
     args = parser.parse_args()
 
+    if not args.debug and importlib.util.find_spec('gunicorn'):
+        # Serve with gunicorn (gunicorn_conf.py) rather than the development
+        # server: a fixed thread pool instead of a thread per request. This
+        # process is replaced; the worker opens the camera itself.
+        os.environ['GOLF_CAM_CONFIG'] = os.path.abspath(args.config)
+        os.environ['GOLF_CAM_DEMO'] = '1' if args.demo else '0'
+        app_dir = os.path.dirname(os.path.abspath(__file__))
+        os.execv(sys.executable, [
+            sys.executable, '-m', 'gunicorn',
+            '--chdir', app_dir,
+            '-c', os.path.join(app_dir, 'gunicorn_conf.py'),
+            '-b', f'{args.host}:{args.port}',
+            'web_interface:app',
+        ])
+
+    # --debug, or no gunicorn (macOS dev setups): Flask's own server
     initialize_camera(args.config, demo_mode=args.demo)
 
     try: